@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image
 import os
 import re
-import base64
 import time
+import hmac
+import json
+
+import assets
+import family_registry as registry
+from family_registry import batch, metrics
 
 # --- إعدادات الصفحة (يجب أن تكون أول أمر) ---
 st.set_page_config(
@@ -14,105 +18,54 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# زمن تشغيل السكربت كاملاً لكل صفحة (يُسجل في نهاية الملف)
+rerun_started = time.perf_counter()
+
 # ==============================================================================
 # 1. الإعدادات والتحميل (Backend Logic)
 # ==============================================================================
 
-@st.cache_data
+@st.cache_resource
+def get_data_store():
+    """مخزن بيانات مشترك لكل الجلسات: يراقب ملف البيانات ويعيد تحميله في الخلفية عند تغيّره"""
+    return registry.DataStore(poll_interval=30)
+
 def load_data():
-    """تحميل بيانات العائلة للبحث"""
-    df = None
-    
-    # قائمة بأسماء الملفات المحتملة (للتعامل مع أي ملف قمت برفعه)
-    possible_files = [
-        "data.xlsx", "data.csv",
-        "عائلة الاسطل20.11.2025.xlsx - ورقة1.csv",
-        "alastal family.xlsx - ورقة1.csv"
-    ]
-    
-    file_path = ""
-    for name in possible_files:
-        if os.path.exists(name):
-            file_path = name
-            break
-            
-    if not file_path: return None
-
-    try:
-        if file_path.endswith('.xlsx'):
-            df = pd.read_excel(file_path, engine='openpyxl', header=0)
-        else:
-            encodings = ['utf-8', 'utf-8-sig', 'windows-1256', 'iso-8859-6']
-            for enc in encodings:
-                try:
-                    df = pd.read_csv(file_path, encoding=enc, on_bad_lines='skip', engine='python', header=0)
-                    break
-                except: continue
-        
-        if df is None: return None
-        
-        # تنظيف وتوحيد البيانات
-        df.columns = df.columns.astype(str).str.replace('\n', ' ').str.strip()
-        
-        # خريطة لتوحيد أسماء الأعمدة المختلفة
-        col_map = {
-            "رقم الهوية": ["رقم الهوية", "الهوية"],
-            "الاسم": ["الاسم", "الاسم الرباعي"],
-            "رقم الهاتف": ["رقم الهاتف", "رقم الموبايل", "الجوال"],
-            "الحالة الاجتماعية": ["الحالة الاجتماعية"],
-            "عدد الافراد": ["عدد افراد الاسرة", "عدد الافراد"],
-            "هوية الزوجة": ["هوية الزوجة", "رقم هوية الزوجة"],
-            "اسم الزوجة": ["اسم الزوجة"]
-        }
-        
-        final_cols = {}
-        for key, candidates in col_map.items():
-            for cand in candidates:
-                if cand in df.columns:
-                    final_cols[cand] = key
-                    break
-        
-        df = df.rename(columns=final_cols)
-        # التأكد من وجود عمود الهوية وتنظيفه
-        if 'رقم الهوية' in df.columns:
-            df['رقم الهوية'] = df['رقم الهوية'].astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
-            
-        return df
-    except: return None
+    """تحميل بيانات العائلة للبحث (النسخة الحالية؛ تُستبدل كاملة عند وصول ملف جديد)"""
+    return get_data_store().dataset
 
-df = load_data()
+data = load_data()
+df = data.df if data is not None else None
 
-def get_image_base64(path):
-    """تحويل الشعار لـ Base64 للخلفية"""
-    if os.path.exists(path):
-        try:
-            with open(path, "rb") as f:
-                return base64.b64encode(f.read()).decode()
-        except: return ""
-    return ""
+@st.cache_resource
+def get_assets():
+    """تجهيز الصور المضغوطة (WebP) مرة واحدة لكل عملية وتقديمها كملفات ثابتة"""
+    return assets.build_assets()
 
-logo_b64 = get_image_base64("logo.jpg") # يرجى التأكد من وجود صورة logo.jpg
+site_assets = get_assets()
 
 # ==============================================================================
 # 2. التصميم المتقدم (Advanced CSS Styles)
 # ==============================================================================
 
-# خلفية متدرجة ملكية (أخضر وذهبي) مع الشعار الشفاف
-css_background = ""
-if logo_b64:
-    css_background = f"""
+@st.cache_resource
+def page_css():
+    """كتلة CSS للموقع (تُبنى مرة واحدة لكل عملية بدل إعادة تركيبها مع كل تفاعل)"""
+    # خلفية متدرجة ملكية (أخضر وذهبي) مع الشعار الشفاف
+    css_background = ""
+    if 'background' in site_assets:
+        css_background = f"""
         .stApp {{
             background-image: linear-gradient(rgba(255, 255, 255, 0.92), rgba(255, 255, 255, 0.92)), 
-                              url('data:image/jpeg;base64,{logo_b64}');
+                              url('{site_assets['background']['url']}');
             background-size: cover;
             background-attachment: fixed;
             background-position: center;
         }}
-    """
-else:
-    css_background = ".stApp { background-color: #f9f9f9; }"
-
-st.markdown(f"""
+        """
+    else:
+        css_background = ".stApp { background-color: #f9f9f9; }"
+    return f"""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Cairo:wght@300;400;600;700;900&display=swap');
     
@@ -221,7 +174,11 @@ st.markdown(f"""
     .nav-btn-container {{ display: flex; justify-content: center; gap: 20px; margin-bottom: 20px; }}
     
     </style>
-""", unsafe_allow_html=True)
+"""
+
+css_started = time.perf_counter()
+st.markdown(page_css(), unsafe_allow_html=True)
+metrics.observe("render.css", time.perf_counter() - css_started)
 
 # ==============================================================================
 # 3. الهيكل والتنقل (Navigation Logic)
@@ -230,11 +187,114 @@ st.markdown(f"""
 if 'active_page' not in st.session_state:
     st.session_state.active_page = 'home'
 
+# صفحة قياسات الأداء للمشغل فقط: تظهر عند فتح الموقع بالرابط ?ops=<ALASTAL_OPS_TOKEN>
+OPS_TOKEN = os.environ.get("ALASTAL_OPS_TOKEN", "")
+# المقارنة كبايتات: compare_digest يرفض النصوص غير ASCII (?ops=ا مثلاً)
+ops_allowed = bool(OPS_TOKEN) and hmac.compare_digest(st.query_params.get("ops", "").encode("utf-8"), OPS_TOKEN.encode("utf-8"))
+
+# تصفح السجل لموظفي اللجان فقط: ?staff=<ALASTAL_STAFF_TOKEN> (أو رابط المشغل)
+STAFF_TOKEN = os.environ.get("ALASTAL_STAFF_TOKEN", "")
+staff_allowed = ops_allowed or (bool(STAFF_TOKEN) and hmac.compare_digest(st.query_params.get("staff", "").encode("utf-8"), STAFF_TOKEN.encode("utf-8")))
+
+NEWS_IMG_STYLE = "width:100%; height:100%; object-fit:cover; display:block;"
+
 def navigate_to(page):
     st.session_state.active_page = page
 
+def mask_id(value):
+    """إخفاء رقم الهوية في نتائج البحث بالاسم (تظهر آخر 4 خانات فقط)"""
+    value = registry.normalize_id_one(value)
+    return '*' * max(len(value) - 4, 0) + value[-4:]
+
+def member_card_html(row):
+    """بطاقة النتيجة لسجل فرد واحد"""
+    return f"""
+    <div style="background: white; border: 2px solid #004d00; border-radius: 15px; padding: 30px; margin-top: 20px; position: relative;">
+        <div style="position: absolute; top: 0; left: 0; width: 100%; height: 8px; background: #c5a059;"></div>
+        <h3 style="color: #004d00; text-align: center; margin-bottom: 25px;">بطاقة تعريف فردية</h3>
+        
+        <div style="display: grid; grid-template-columns: 1fr 2fr; gap: 15px; font-size: 1.1rem;">
+            <div style="font-weight: bold; color: #666;">الاسم الكامل:</div>
+            <div style="color: #000; font-weight: 700;">{row.get('الاسم', '-')}</div>
+            
+            <div style="border-bottom: 1px dashed #eee; grid-column: 1 / -1;"></div>
+
+            <div style="font-weight: bold; color: #666;">رقم الهوية:</div>
+            <div>{registry.normalize_id_one(row.get('رقم الهوية')) or '-'}</div>
+            
+            <div style="font-weight: bold; color: #666;">رقم الهاتف:</div>
+            <div>{row.get('رقم الهاتف', '-')}</div>
+            
+            <div style="font-weight: bold; color: #666;">الفرع:</div>
+            <div>{row.get('الفرع', 'غير محدد')}</div>
+            
+            <div style="font-weight: bold; color: #666;">الحالة الاجتماعية:</div>
+            <div>{row.get('الحالة الاجتماعية', '-')}</div>
+            
+            <div style="font-weight: bold; color: #666;">الزوجة:</div>
+            <div>{row.get('اسم الزوجة', '-')}</div>
+        </div>
+    </div>
+    """
+
+def lineage_html(lineage):
+    """سلسلة النسب تحت البطاقة: الشخص ← الأب ← الجد... (الأجداد غير المسجلين بلون باهت)"""
+    nodes, unresolved = lineage
+    links = [f"<span style='color:#004d00; font-weight:700;'>{n['name']}</span>" for n in nodes[:1]]
+    links += [f"<span style='color:#004d00;'>{n['name']}</span>" for n in nodes[1:]]
+    links += [f"<span style='color:#aaa;'>{name}</span>" for name in unresolved]
+    me = nodes[0]
+    return f"""
+    <div style="background: #f9f7f0; border-right: 4px solid #c5a059; border-radius: 10px; padding: 15px 20px; margin-top: 10px;">
+        <div style="font-weight: bold; color: #666; margin-bottom: 8px;">🌳 سلسلة النسب</div>
+        <div style="line-height: 2;">{' ← '.join(links)}</div>
+        <div style="color: #888; font-size: 0.9rem; margin-top: 8px;">
+            الجيل {me['depth'] + 1} في السجل · الأبناء المسجلون: {me['children']} · الذرية المسجلة: {me['descendants']}
+        </div>
+    </div>
+    """
+
+@st.cache_resource
+def get_result_cache():
+    """نتائج البحث برقم الهوية الجاهزة (HTML) مشتركة بين كل الجلسات، وتُفرَّغ عند وصول نسخة بيانات جديدة"""
+    return registry.ResultCache("results.cache", max_size=5000, ttl=600, max_bytes=16 * 2**20)
+
+def lookup_result(data, query):
+    """(الحقل، عدد السجلات، بطاقات HTML) لاستعلام الخدمات؛ الحقل None إذا لم يوجد سجل"""
+    # البحث في الفهرس سريع؛ المفتاح الموحد (الحقل، الرقم) يجمع صيغ الرقم المختلفة في مدخل واحد
+    with metrics.timer("lookup.find"):
+        field, key, positions = data.index.resolve(query)
+    metrics.incr("lookup.found" if positions else "lookup.not_found")
+    cache = get_result_cache()
+    result = cache.get((field, key), data.version)
+    if result is None:
+        # بناء البطاقة وسلسلة النسب لكل سجل
+        blocks = []
+        for row in data.rows(positions):
+            blocks.append(member_card_html(row))
+            lineage = data.lineage(row.name)
+            if lineage:
+                blocks.append(lineage_html(lineage))
+        result = (field, len(positions), tuple(blocks))
+        cache.put((field, key), result, data.version)
+    return result
+
+@st.cache_resource
+def footer_html():
+    """الفوتر (ثابت؛ يُبنى مرة واحدة لكل عملية)"""
+    return f"""
+    <div class="footer">
+        {assets.img_tag(site_assets, 'logo-small', alt="شعار العائلة", style="width:50px; height:50px; border-radius:50%; margin-bottom:10px; opacity:0.5;")}
+        <p style="margin-bottom: 5px;">جميع الحقوق محفوظة © لمجلس عائلة الأسطل 2025</p>
+        <p style="font-size: 0.8rem; opacity: 0.6;">تم التصميم والتطوير بجهود: <b>أ. قصي صبحي الأسطل</b></p>
+        <br>
+        <a href="#" style="color:#c5a059; text-decoration:none; margin:0 10px;">اتصل بنا</a>
+        <a href="#" style="color:#c5a059; text-decoration:none; margin:0 10px;">سياسة الخصوصية</a>
+    </div>
+"""
+
 # --- الشريط العلوي (Header) ---
-st.markdown(f"""
+st.markdown("""
 <div class="custom-header">
     <div style="font-size:1.5rem; font-weight:900;">ديوان عائلة الأسطل</div>
     <div style="font-size:0.9rem; opacity:0.9;">الأصالة • التاريخ • المستقبل</div>
@@ -243,7 +303,15 @@ st.markdown(f"""
 
 # أزرار التنقل (كأزرار Streamlit لسهولة التحكم)
 col_n1, col_n2, col_n3, col_n4 = st.columns([1, 1, 1, 3])
-with col_n4: st.write("") # مسافة فارغة
+with col_n4:
+    col_o1, col_o2 = st.columns(2)
+    with col_o1:
+        if staff_allowed:
+            if st.button("🗂️ تصفح السجل"): navigate_to('browse')
+        else: st.write("") # مسافة فارغة
+    with col_o2:
+        if ops_allowed:
+            if st.button("📊 قياسات الأداء"): navigate_to('ops')
 with col_n3: 
     if st.button("🏠 الرئيسية", use_container_width=True): navigate_to('home')
 with col_n2: 
@@ -295,9 +363,9 @@ if st.session_state.active_page == 'home':
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         <div class="news-card">
-            <div class="news-img" style="background-image: url('https://via.placeholder.com/400x250/004d00/ffffff?text=مجلس+العائلة');"></div>
+            <div class="news-img">{assets.img_tag(site_assets, 'news-council', style=NEWS_IMG_STYLE)}</div>
             <div class="news-content">
                 <span class="news-tag">أخبار المجلس</span>
                 <h4 style="color:#004d00; margin:10px 0;">اجتماع الجمعية العمومية السنوي</h4>
@@ -307,9 +375,9 @@ if st.session_state.active_page == 'home':
         """, unsafe_allow_html=True)
         
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         <div class="news-card">
-            <div class="news-img" style="background-image: url('https://via.placeholder.com/400x250/c5a059/ffffff?text=تكريم+المتفوقين');"></div>
+            <div class="news-img">{assets.img_tag(site_assets, 'news-honors', style=NEWS_IMG_STYLE)}</div>
             <div class="news-content">
                 <span class="news-tag">تفوق ونجاح</span>
                 <h4 style="color:#004d00; margin:10px 0;">حفل تكريم أوائل الطلبة 2025</h4>
@@ -319,9 +387,9 @@ if st.session_state.active_page == 'home':
         """, unsafe_allow_html=True)
         
     with col3:
-        st.markdown("""
+        st.markdown(f"""
         <div class="news-card">
-            <div class="news-img" style="background-image: url('https://via.placeholder.com/400x250/333/ffffff?text=زيارات+اجتماعية');"></div>
+            <div class="news-img">{assets.img_tag(site_assets, 'news-visits', style=NEWS_IMG_STYLE)}</div>
             <div class="news-content">
                 <span class="news-tag">اجتماعيات</span>
                 <h4 style="color:#004d00; margin:10px 0;">وفد العائلة يزور حجاج بيت الله</h4>
@@ -331,14 +399,14 @@ if st.session_state.active_page == 'home':
         """, unsafe_allow_html=True)
 
     # قسم شخصيات (Featured Person)
-    st.markdown("""
+    st.markdown(f"""
     <div class="section-header">
         <h2>شخصيات في ذاكرة العائلة</h2>
         <div class="line"></div>
     </div>
     <div style="background: white; padding: 40px; border-radius: 20px; box-shadow: 0 5px 20px rgba(0,0,0,0.05); display: flex; gap: 30px; align-items: center; max-width: 900px; margin: 0 auto; flex-wrap: wrap;">
         <div style="flex: 1; min-width: 200px;">
-            <img src="https://via.placeholder.com/300x350?text=القاضي+أحمد+الأسطل" style="width:100%; border-radius: 15px; border: 5px solid #c5a059;">
+            {assets.img_tag(site_assets, 'featured-judge', alt="القاضي أحمد علي الأسطل", style="width:100%; height:auto; border-radius: 15px; border: 5px solid #c5a059;")}
         </div>
         <div style="flex: 2;">
             <h3 style="color: #004d00; font-size: 1.8rem;">القاضي أحمد علي الأسطل (رحمه الله)</h3>
@@ -369,60 +437,104 @@ elif st.session_state.active_page == 'services':
     with col_side:
         st.info("""
         **تعليمات الاستخدام:**
-        1. أدخل رقم الهوية (9 خانات) في الحقل المخصص.
+        1. أدخل رقم الهوية (9 خانات) أو هوية الزوجة أو رقم الجوال في الحقل المخصص.
         2. اضغط على زر "بحث".
         3. تأكد من صحة بياناتك وتواصل معنا للتحديث.
         """)
         if df is None:
             st.error("⚠️ تنبيه: جاري تحديث قاعدة البيانات، يرجى المحاولة لاحقاً.")
             
-    with col_main:
-        # نموذج البحث
-        search_id = st.text_input("رقم الهوية", placeholder="أدخل رقم الهوية هنا...", max_chars=9).strip()
+    # نموذج البحث ونتائجه كجزء مستقل (fragment): الضغط على "بحث" يعيد تشغيل هذه الدالة فقط
+    # بدل السكربت كاملاً (بدون إعادة إرسال CSS والترويسة والفوتر)
+    @st.fragment
+    def search_panel():
+        fragment_started = time.perf_counter()
+        # النسخة الحالية من البيانات (قد تتغير بين تشغيلات الجزء بعد إعادة التحميل في الخلفية)
+        data = load_data()
+        df = data.df if data is not None else None
+        tab_id, tab_name, tab_batch = st.tabs(["🔎 البحث برقم الهوية", "👤 البحث بالاسم", "📋 تحقق جماعي"])
         
-        if st.button("بحث في السجل المدني للعائلة", use_container_width=True):
-            if df is not None and search_id:
-                if not re.fullmatch(r'\d+', search_id) or len(search_id) != 9:
-                    st.warning("⚠️ يرجى إدخال رقم هوية صحيح مكون من 9 أرقام.")
+        with tab_id:
+            # نموذج البحث
+            search_id = st.text_input("رقم الهوية", placeholder="أدخل رقم الهوية أو هوية الزوجة أو رقم الجوال...", max_chars=14).strip()
+        
+            if st.button("بحث في السجل المدني للعائلة", use_container_width=True):
+                if df is not None and search_id:
+                    if not re.fullmatch(r'\+?\d{9,13}', search_id):
+                        st.warning("⚠️ يرجى إدخال رقم هوية صحيح مكون من 9 أرقام أو رقم جوال.")
+                    else:
+                        # النتيجة الجاهزة من الذاكرة المشتركة، أو البحث في الفهرس عند أول طلب للرقم
+                        field, count, blocks = lookup_result(data, search_id)
+                        if field is not None:
+                            st.balloons() # تأثير احتفالي عند العثور
+                            if field != 'رقم الهوية':
+                                st.info(f"تم العثور على السجل عن طريق: {field}")
+                            if count > 1:
+                                st.warning(f"⚠️ يوجد {count} سجلات مسجلة بنفس الرقم، يرجى مراجعة مجلس العائلة لتصحيح البيانات.")
+                            # بطاقة النتيجة
+                            for block in blocks:
+                                st.markdown(block, unsafe_allow_html=True)
+                        else:
+                            st.error(f"❌ لم يتم العثور على سجل مطابق للرقم: {search_id}")
+                elif not search_id:
+                    st.warning("الرجاء إدخال رقم الهوية.")
+        
+        with tab_name:
+            # البحث التقريبي بالاسم (فهرس ثلاثيات الحروف)
+            search_name = st.text_input("الاسم", placeholder="اكتب الاسم الرباعي أو جزءاً منه...", max_chars=80).strip()
+            if df is not None and search_name:
+                if len(registry.normalize_arabic(search_name)) < 3:
+                    st.warning("⚠️ يرجى كتابة ثلاثة أحرف على الأقل.")
                 else:
-                    # البحث
-                    res = df[df['رقم الهوية'] == search_id]
-                    if not res.empty:
-                        row = res.iloc[0]
-                        st.balloons() # تأثير احتفالي عند العثور
-                        # بطاقة النتيجة
-                        st.markdown(f"""
-                        <div style="background: white; border: 2px solid #004d00; border-radius: 15px; padding: 30px; margin-top: 20px; position: relative;">
-                            <div style="position: absolute; top: 0; left: 0; width: 100%; height: 8px; background: #c5a059;"></div>
-                            <h3 style="color: #004d00; text-align: center; margin-bottom: 25px;">بطاقة تعريف فردية</h3>
-                            
-                            <div style="display: grid; grid-template-columns: 1fr 2fr; gap: 15px; font-size: 1.1rem;">
-                                <div style="font-weight: bold; color: #666;">الاسم الكامل:</div>
-                                <div style="color: #000; font-weight: 700;">{row.get('الاسم', '-')}</div>
-                                
-                                <div style="border-bottom: 1px dashed #eee; grid-column: 1 / -1;"></div>
-
-                                <div style="font-weight: bold; color: #666;">رقم الهوية:</div>
-                                <div>{row.get('رقم الهوية', '-')}</div>
-                                
-                                <div style="font-weight: bold; color: #666;">رقم الهاتف:</div>
-                                <div>{row.get('رقم الهاتف', '-')}</div>
-                                
-                                <div style="font-weight: bold; color: #666;">الفرع:</div>
-                                <div>{row.get('الفرع', 'غير محدد')}</div>
-                                
-                                <div style="font-weight: bold; color: #666;">الحالة الاجتماعية:</div>
-                                <div>{row.get('الحالة الاجتماعية', '-')}</div>
-                                
-                                <div style="font-weight: bold; color: #666;">الزوجة:</div>
-                                <div>{row.get('اسم الزوجة', '-')}</div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    matches = data.search_name(search_name, k=10)
+                    if matches:
+                        st.dataframe(pd.DataFrame([{
+                            "الاسم": row.get('الاسم', '-'),
+                            "الفرع": row.get('الفرع', 'غير محدد'),
+                            "رقم الهوية": mask_id(row.get('رقم الهوية', '')),
+                            "نسبة التطابق": f"{score:.0%}",
+                        } for row, score in matches]), hide_index=True, use_container_width=True)
+                        st.caption("لعرض البطاقة الكاملة استخدم البحث برقم الهوية.")
                     else:
-                        st.error(f"❌ لم يتم العثور على سجل برقم الهوية: {search_id}")
-            elif not search_id:
-                st.warning("الرجاء إدخال رقم الهوية.")
+                        st.error(f"❌ لا توجد أسماء مطابقة لـ: {search_name}")
+        
+        with tab_batch:
+            # التحقق من قائمة أرقام دفعة واحدة (للجان قبل توزيع المساعدات)
+            st.caption(f"الصق أرقام الهوية (كل رقم في سطر) أو ارفع ملف CSV/Excel يحتوي عمود رقم الهوية. الحد الأقصى {batch.MAX_BATCH} رقم.")
+            pasted_ids = st.text_area("أرقام الهوية", height=150, placeholder="401234567\n802345678\n...")
+            id_file = st.file_uploader("أو ارفع ملفاً", type=["csv", "xlsx"])
+            
+            if st.button("تحقق من القائمة", use_container_width=True):
+                ids = batch.parse_id_list(pasted_ids)
+                if id_file is not None:
+                    try:
+                        ids += batch.read_id_file(id_file.getvalue(), id_file.name)
+                    except Exception:
+                        st.error("⚠️ تعذرت قراءة الملف، تأكد أنه CSV أو Excel صالح.")
+                if df is None:
+                    st.error("⚠️ قاعدة البيانات غير متاحة حالياً.")
+                elif not ids:
+                    st.warning("الرجاء إدخال أرقام أو رفع ملف.")
+                else:
+                    if len(ids) > batch.MAX_BATCH:
+                        st.warning(f"⚠️ تم التحقق من أول {batch.MAX_BATCH} رقم فقط.")
+                    result = batch.verify_ids(data, ids)
+                    summary = batch.summarize(result)
+                    
+                    m1, m2, m3, m4 = st.columns(4)
+                    m1.metric(batch.STATUS_FOUND, summary.get(batch.STATUS_FOUND, 0))
+                    m2.metric(batch.STATUS_DUPLICATE, summary.get(batch.STATUS_DUPLICATE, 0))
+                    m3.metric(batch.STATUS_NOT_FOUND, summary.get(batch.STATUS_NOT_FOUND, 0))
+                    m4.metric(batch.STATUS_INVALID, summary.get(batch.STATUS_INVALID, 0))
+                    
+                    st.dataframe(result.head(200), hide_index=True, use_container_width=True)
+                    d1, d2 = st.columns(2)
+                    with d1: st.download_button("⬇️ تنزيل النتائج (Excel)", batch.to_xlsx_bytes(result), "نتائج_التحقق.xlsx", use_container_width=True)
+                    with d2: st.download_button("⬇️ تنزيل النتائج (CSV)", batch.to_csv_bytes(result), "نتائج_التحقق.csv", "text/csv", use_container_width=True)
+        metrics.observe("fragment.search", time.perf_counter() - fragment_started)
+    
+    with col_main:
+        search_panel()
 
 # --- صفحة الأرشيف (Archive) ---
 elif st.session_state.active_page == 'archive':
@@ -445,22 +557,160 @@ elif st.session_state.active_page == 'archive':
     
     # معرض الصور
     st.markdown("### 📷 صور من عبق الماضي")
-    col_g1, col_g2, col_g3 = st.columns(3)
-    with col_g1: st.image("https://via.placeholder.com/400x300?text=وثائق+عثمانية", use_column_width=True, caption="وثائق ملكية أراضي قديمة")
-    with col_g2: st.image("https://via.placeholder.com/400x300?text=ديوان+المختار", use_column_width=True, caption="ديوان المختار القديم - 1950")
-    with col_g3: st.image("https://via.placeholder.com/400x300?text=رجال+العائلة", use_column_width=True, caption="صورة جماعية لرجال العائلة - 1970")
+    gallery = [
+        ('archive-ottoman', "وثائق ملكية أراضي قديمة"),
+        ('archive-diwan', "ديوان المختار القديم - 1950"),
+        ('archive-men', "صورة جماعية لرجال العائلة - 1970"),
+    ]
+    for col_g, (key, caption) in zip(st.columns(3), gallery):
+        # وسم img عادي بتحميل كسول بدل st.image (الصورة تُطلب فقط عند ظهورها ويخزنها المتصفح)
+        with col_g: st.markdown(f"""
+            <figure style="margin:0; text-align:center;">
+                {assets.img_tag(site_assets, key, alt=caption, style="width:100%; height:auto; border-radius: 10px;")}
+                <figcaption style="color:#666; font-size:0.9rem; margin-top:5px;">{caption}</figcaption>
+            </figure>
+            """, unsafe_allow_html=True)
+    
+    # فروع العائلة من الشجرة المبنية مسبقاً مع البيانات
+    if data is not None and data.tree is not None:
+        tree = data.tree
+        st.markdown("### 🌳 فروع العائلة")
+        t1, t2, t3 = st.columns(3)
+        t1.metric("الأفراد", tree.stats['persons'])
+        t2.metric("الأجيال المسجلة", tree.stats['generations'])
+        t3.metric("روابط أب/ابن", tree.stats['linked'])
+        if len(tree.branch_summary):
+            st.dataframe(tree.branch_summary, hide_index=True, use_container_width=True)
+            branch = st.selectbox("عرض أفراد فرع", tree.branch_summary['الفرع'].tolist())
+            st.dataframe(tree.members(branch, limit=500), hide_index=True, use_container_width=True)
+            st.caption("تُعرض أول 500 فرد من الفرع مرتبين حسب الجيل ثم الاسم.")
+
+# --- صفحة تصفح السجل (Browse) ---
+elif st.session_state.active_page == 'browse' and staff_allowed:
+    st.markdown("""
+    <div class="section-header">
+        <h2>تصفح سجل الأفراد</h2>
+        <div class="line"></div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # الفلاتر تُجاب من فهارس مبنية مسبقاً مع البيانات (data.browse)، ولا يُرسل للمتصفح إلا صفوف الصفحة الحالية
+    @st.fragment
+    def browse_panel():
+        fragment_started = time.perf_counter()
+        data = load_data()
+        if data is None:
+            st.error("⚠️ تنبيه: جاري تحديث قاعدة البيانات، يرجى المحاولة لاحقاً.")
+            return
+        browse = data.browse
+        if not browse.facets:
+            st.info("لا توجد في ملف البيانات أعمدة للتصفح (الفرع، الحالة الاجتماعية، عدد الافراد).")
+            return
+        
+        filters = {}
+        for col_f, column in zip(st.columns(len(browse.facets)), browse.facets):
+            counts = browse.counts(column)
+            with col_f:
+                filters[column] = st.multiselect(column, counts.index.tolist(), key=f"browse_{column}",
+                                                 format_func=lambda v, c=counts: f"{v} ({c[v]:,})", placeholder="الكل")
+        positions = browse.select(filters)
+        
+        col_p1, col_p2, col_p3 = st.columns([1, 1, 2])
+        with col_p1:
+            page_size = st.selectbox("عدد الصفوف في الصفحة", [25, 50, 100, 200], index=1, key="browse_page_size")
+        pages = max(1, -(-len(positions) // page_size))
+        if st.session_state.get("browse_page", 1) > pages:
+            st.session_state.browse_page = 1
+        with col_p2:
+            page = st.number_input(f"الصفحة (من {pages:,})", min_value=1, max_value=pages, step=1, key="browse_page")
+        with col_p3:
+            st.metric("السجلات المطابقة", f"{len(positions):,}", f"من {len(data):,}", delta_color="off")
+        
+        st.dataframe(browse.page(data.df, positions, page, page_size), hide_index=True, use_container_width=True)
+        
+        with st.expander("📊 توزيع السجلات المطابقة"):
+            for col_a, column in zip(st.columns(len(browse.facets)), browse.facets):
+                with col_a:
+                    counts = browse.counts(column, positions)
+                    st.dataframe(counts[counts > 0], use_container_width=True)
+        metrics.observe("fragment.browse", time.perf_counter() - fragment_started)
+    
+    browse_panel()
+
+# --- صفحة قياسات الأداء (Operator Metrics) ---
+elif st.session_state.active_page == 'ops' and ops_allowed:
+    st.markdown("""
+    <div class="section-header">
+        <h2>قياسات الأداء</h2>
+        <div class="line"></div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    store = get_data_store()
+    stats = metrics.snapshot()
+    memory = data.memory_usage() if data is not None else {}
+    compaction = data.load_report.get('memory', {}) if data is not None else {}
+    snapshot_ratio = metrics.hit_ratio(stats['counters'], 'snapshot')
+    
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("عدد السجلات", len(data) if data is not None else 0)
+    m2.metric("الذاكرة (بيانات + فهارس)", f"{sum(memory.values()) / 2**20:.1f} MB")
+    m3.metric("إصابة اللقطة الثنائية", f"{snapshot_ratio:.0%}" if snapshot_ratio is not None else "-")
+    m4.metric("آخر تحميل", f"{store.last_reload.get('seconds', 0)} ث", store.last_reload.get('mode', '-'), delta_color="off")
+    
+    result_cache = get_result_cache().stats()
+    results_ratio = result_cache['hit_ratio']
+    st.caption(f"ذاكرة نتائج البحث: {result_cache['entries']:,} نتيجة من {result_cache['max_size']:,}"
+               f" · {result_cache['bytes'] / 2**20:.1f} MB من {result_cache['max_bytes'] / 2**20:.0f} MB"
+               f" · نسبة الإصابة {f'{results_ratio:.0%}' if results_ratio is not None else '-'}")
+    
+    st.markdown("#### الأزمنة (مللي ثانية)")
+    st.dataframe(pd.DataFrame.from_dict(stats['timings'], orient='index'), use_container_width=True)
+    
+    if compaction:
+        st.caption(f"ضغط الجدول عند التحميل: {compaction['bytes_before'] / 2**20:.1f} MB ← {compaction['bytes_after'] / 2**20:.1f} MB"
+                   f" (أعمدة محذوفة: {', '.join(compaction['dropped_columns']) or 'لا يوجد'})")
+    
+    if data is not None:
+        quality = data.quality
+        st.markdown(f"#### جودة البيانات ({len(quality)} ملاحظة على {quality.checked} سجل)")
+        st.dataframe(pd.Series(quality.summary, name="العدد", dtype="int64"), use_container_width=True)
+        if len(quality):
+            st.download_button("⬇️ تنزيل تقرير الجودة (CSV)", quality.to_csv_bytes(data.df), "تقرير_جودة_البيانات.csv", "text/csv")
+    
+    sources = data.load_report.get('sources', []) if data is not None else []
+    if len(sources) > 1:
+        st.markdown("#### مصادر البيانات (الأحدث يغلب لكل رقم هوية)")
+        st.dataframe(pd.DataFrame(sources).rename(columns={
+            'path': 'الملف', 'rows': 'الصفوف', 'kept': 'المعتمد', 'seconds': 'الزمن (ث)', 'format': 'الصيغة', 'error': 'خطأ',
+        }), hide_index=True, use_container_width=True)
+    
+    col_c, col_m = st.columns(2)
+    with col_c:
+        st.markdown("#### العدادات")
+        st.dataframe(pd.Series(stats['counters'], name="العدد", dtype="int64"), use_container_width=True)
+    with col_m:
+        st.markdown("#### الذاكرة (MB)")
+        st.dataframe(pd.Series({k: round(v / 2**20, 2) for k, v in memory.items()}, name="MB", dtype="float64"), use_container_width=True)
+    
+    report = {
+        **stats,
+        "dataset": {
+            "source": data.source if data is not None else None,
+            "rows": len(data) if data is not None else 0,
+            "memory_bytes": memory,
+            "load_report": data.load_report if data is not None else {},
+        },
+        "last_reload": store.last_reload,
+        "reload_count": store.reload_count,
+        "result_cache": result_cache,
+    }
+    st.download_button("⬇️ تصدير القياسات (JSON)", json.dumps(report, ensure_ascii=False, indent=2, default=str), "metrics.json", "application/json")
 
 
 # ==============================================================================
 # 5. الفوتر (Footer)
 # ==============================================================================
-st.markdown("""
-    <div class="footer">
-        <img src="https://via.placeholder.com/50/ffffff/000000?text=Logo" style="border-radius:50%; margin-bottom:10px; opacity:0.5;">
-        <p style="margin-bottom: 5px;">جميع الحقوق محفوظة © لمجلس عائلة الأسطل 2025</p>
-        <p style="font-size: 0.8rem; opacity: 0.6;">تم التصميم والتطوير بجهود: <b>أ. قصي صبحي الأسطل</b></p>
-        <br>
-        <a href="#" style="color:#c5a059; text-decoration:none; margin:0 10px;">اتصل بنا</a>
-        <a href="#" style="color:#c5a059; text-decoration:none; margin:0 10px;">سياسة الخصوصية</a>
-    </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(footer_html(), unsafe_allow_html=True)
+
+metrics.observe(f"rerun.{st.session_state.active_page}", time.perf_counter() - rerun_started)
\ No newline at end of file
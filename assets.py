@@ -0,0 +1,124 @@
+"""تجهيز الصور الثابتة للموقع (الشعار، الخلفية، صور الأخبار والأرشيف).
+
+تُنتج نسخ WebP مصغّرة ومضغوطة مرة واحدة بأسماء تحتوي بصمة المحتوى داخل static/build،
+ويخدمها Streamlit كملفات ثابتة (server.enableStaticServing) فيخزنها المتصفح بدل إعادة إرسالها مع كل تفاعل.
+
+لإضافة صور حقيقية ضعها في مجلد assets/ بالأسماء الموجودة في IMAGES، وإلا تُولَّد صورة بديلة من الشعار
+بلون القسم (بدون الاعتماد على مواقع خارجية).
+
+البناء يدوياً (اختياري، يحدث تلقائياً عند أول تشغيل):
+    python assets.py
+"""
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image, ImageFilter, ImageOps
+
+# المسارات بجانب app.py: Streamlit يخدم static/ من مجلد السكربت الرئيسي وليس من مجلد التشغيل
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+LOGO = os.path.join(APP_DIR, "logo.jpg")
+SOURCE_DIR = os.path.join(APP_DIR, "assets")
+BUILD_DIR = os.path.join(APP_DIR, "static", "build")
+# المسار الذي يخدم منه Streamlit مجلد static
+STATIC_URL = "app/static/build"
+
+# الاسم المنطقي -> (الملف المصدر داخل assets/، المقاس، لون البديل)
+IMAGES = {
+    "news-council": ("news/council.jpg", (400, 250), "#004d00"),
+    "news-honors": ("news/honors.jpg", (400, 250), "#c5a059"),
+    "news-visits": ("news/visits.jpg", (400, 250), "#333333"),
+    "featured-judge": ("people/judge-ahmad.jpg", (300, 350), "#004d00"),
+    "archive-ottoman": ("archive/ottoman-documents.jpg", (400, 300), "#5d4a1f"),
+    "archive-diwan": ("archive/mukhtar-diwan-1950.jpg", (400, 300), "#3e3e3e"),
+    "archive-men": ("archive/family-men-1970.jpg", (400, 300), "#004d00"),
+}
+
+
+def _save_webp(image, name, quality=80):
+    """حفظ الصورة بصيغة WebP باسم يحتوي بصمة المحتوى (لا يُعاد الكتابة إذا كان الملف موجوداً)"""
+    buf = io.BytesIO()
+    image.save(buf, format="WEBP", quality=quality, method=6)
+    data = buf.getvalue()
+    filename = f"{name}-{hashlib.sha1(data).hexdigest()[:10]}.webp"
+    path = os.path.join(BUILD_DIR, filename)
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return {"url": f"{STATIC_URL}/{filename}", "width": image.width, "height": image.height, "bytes": len(data)}
+
+
+def _placeholder(logo, size, color):
+    """صورة بديلة محلية: الشعار بدرجة رمادية شفافة فوق لون القسم"""
+    canvas = Image.new("RGB", size, color)
+    if logo is not None:
+        mark = ImageOps.grayscale(logo)
+        mark.thumbnail((int(size[0] * 0.5), int(size[1] * 0.6)))
+        tint = Image.new("RGB", mark.size, "white")
+        canvas.paste(tint, ((size[0] - mark.width) // 2, (size[1] - mark.height) // 2), mark.point(lambda v: v // 4))
+    return canvas
+
+
+def build_assets():
+    """بناء كل النسخ المطلوبة. يعيد قاموس: الاسم المنطقي -> {url, width, height, bytes}
+
+    إذا تعذرت الكتابة (نشر للقراءة فقط مثلاً) يعيد قاموساً فارغاً: الموقع يعمل بخلفية عادية وبدون صور.
+    """
+    try:
+        return _build()
+    except OSError:
+        return {}
+
+
+def _build():
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    manifest = {}
+
+    logo = None
+    if os.path.exists(LOGO):
+        try:
+            logo = ImageOps.exif_transpose(Image.open(LOGO)).convert("RGB")
+        except OSError:
+            logo = None
+
+    if logo is not None:
+        # خلفية صغيرة مموهة: تغطي الشاشة بتمديد CSS ولا تحتاج تفاصيل
+        bg = logo.copy()
+        bg.thumbnail((480, 480))
+        manifest["background"] = _save_webp(bg.filter(ImageFilter.GaussianBlur(6)), "background", quality=45)
+        # الشعار في الفوتر يُعرض 50px: نسخة 100px للشاشات عالية الدقة
+        small = logo.copy()
+        small.thumbnail((100, 100))
+        manifest["logo-small"] = _save_webp(small, "logo-small")
+
+    for name, (source, size, color) in IMAGES.items():
+        path = os.path.join(SOURCE_DIR, source)
+        try:
+            image = ImageOps.fit(ImageOps.exif_transpose(Image.open(path)).convert("RGB"), size)
+        except OSError:
+            image = _placeholder(logo, size, color)
+        manifest[name] = _save_webp(image, name)
+
+    with open(os.path.join(BUILD_DIR, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def img_tag(manifest, name, alt="", style="", eager=False):
+    """وسم <img> بأبعاد ثابتة وتحميل كسول (lazy) للصور أسفل الصفحة"""
+    asset = manifest.get(name)
+    if not asset:
+        return ""
+    loading = "eager" if eager else "lazy"
+    return (
+        f'<img src="{asset["url"]}" width="{asset["width"]}" height="{asset["height"]}" alt="{alt}" '
+        f'loading="{loading}" decoding="async" style="{style}">'
+    )
+
+
+if __name__ == "__main__":
+    for key, value in build_assets().items():
+        print(f"{key:18} {value['bytes']:>7} B  {value['url']}")
@@ -0,0 +1,132 @@
+"""اختبار حمل لواجهة HTTP (family_registry.api) من جهاز محلي.
+
+عملاء متزامنون (asyncio) باتصالات HTTP/1.1 دائمة، يطلبون أرقام هوية مأخوذة من ملف البيانات مع نسبة
+أرقام غير موجودة، ويُخرج عدد الطلبات في الثانية والمئينات وتوزيع رموز الاستجابة بصيغة JSON:
+
+    # تشغيل خادم على سجل اصطناعي ثم اختباره
+    python -m benchmarks.load_test --spawn 100000 --concurrency 50 --duration 10
+    # اختبار خادم يعمل مسبقاً
+    python -m benchmarks.load_test --url http://127.0.0.1:8600 --data data.xlsx
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+from urllib.parse import urlsplit
+
+from benchmarks.run import ROOT, dataset_path, percentiles
+
+
+async def _get(reader, writer, host, path, token):
+    """طلب GET واحد على اتصال مفتوح. يعيد رمز الاستجابة"""
+    auth = f"Authorization: Bearer {token}\r\n" if token else ""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{auth}Connection: keep-alive\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(url, queries, deadline, token, latencies, statuses):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        while time.perf_counter() < deadline:
+            path = f"{parts.path.rstrip('/')}/v1/id/{random.choice(queries)}"
+            start = time.perf_counter()
+            status = await _get(reader, writer, parts.netloc, path, token)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(url, queries, concurrency=50, duration=10.0, token=""):
+    """تشغيل الحمل وإرجاع ملخص النتائج"""
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_client(url, queries, deadline, token, latencies, statuses) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 2),
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency": percentiles(latencies) if latencies else {},
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+def sample_ids(path, n=2000, miss_ratio=0.1, seed=0):
+    """أرقام هوية من ملف البيانات مع نسبة أرقام عشوائية غير موجودة غالباً"""
+    from family_registry import load_data, normalize_id
+
+    dataset = load_data(path)
+    ids = [i for i in normalize_id(dataset.df["رقم الهوية"]).tolist() if i]
+    rng = random.Random(seed)
+    picked = rng.sample(ids, min(n, len(ids)))
+    misses = [f"{rng.randrange(10 ** 8, 10 ** 9)}" for _ in range(int(len(picked) * miss_ratio))]
+    return picked + misses
+
+
+def wait_ready(url, timeout=300):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/v1/health", timeout=2) as resp:
+                if resp.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="اختبار حمل واجهة HTTP للاستعلام")
+    parser.add_argument("--url", default="http://127.0.0.1:8600")
+    parser.add_argument("--data", help="ملف بيانات لاختيار أرقام الهوية منه (نفس ملف الخادم)")
+    parser.add_argument("--spawn", type=int, metavar="ROWS", help="تشغيل خادم على سجل اصطناعي بهذا الحجم")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--miss-ratio", type=float, default=0.1)
+    parser.add_argument("--token", default=os.environ.get("ALASTAL_API_TOKEN", ""))
+    args = parser.parse_args(argv)
+
+    server = None
+    path = args.data
+    if args.spawn:
+        path = dataset_path(args.spawn, "csv-utf8")
+        port = str(urlsplit(args.url).port or 8600)
+        # حد طلبات مرتفع: كل العملاء من نفس العنوان المحلي
+        server = subprocess.Popen([sys.executable, "-m", "family_registry", "serve-api", path, "--port", port,
+                                   "--rate", "1e9", "--burst", "1000000000"], cwd=ROOT)
+    if not path:
+        parser.error("حدد --data أو --spawn")
+    try:
+        if not wait_ready(args.url):
+            sys.exit("الخادم لم يصبح جاهزاً")
+        queries = sample_ids(path, miss_ratio=args.miss_ratio)
+        result = asyncio.run(run_load(args.url, queries, args.concurrency, args.duration, args.token))
+        print(json.dumps({"url": args.url, "concurrency": args.concurrency, **result}, ensure_ascii=False, indent=2))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
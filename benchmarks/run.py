@@ -0,0 +1,277 @@
+"""قياس أداء التحميل والبحث والعرض على سجلات اصطناعية بأحجام مختلفة.
+
+كل سيناريو يعمل في عملية منفصلة (ذاكرة نظيفة) ويُخرج النتائج بصيغة JSON، ويمكن مقارنتها بنتائج سابقة
+لاكتشاف التراجع بين النسخ:
+
+    python -m benchmarks.run --sizes 10000 100000 -o benchmarks/results/current.json
+    python -m benchmarks.run --sizes 10000 --compare benchmarks/results/baseline.json
+    python -m benchmarks.run --sizes 10000 --render        # يشمل زمن عرض صفحات Streamlit
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+
+# (الصيغة، الترميز، الفاصل)
+VARIANTS = {
+    "csv-utf8": ("csv", "utf-8", ","),
+    "csv-utf8sig": ("csv", "utf-8-sig", ","),
+    "csv-cp1256": ("csv", "windows-1256", ";"),
+    "xlsx": ("xlsx", None, None),
+}
+
+# نسبة الزيادة المسموحة قبل اعتبار القياس تراجعاً
+REGRESSION_THRESHOLD = 0.20
+
+# القياسات التي تُقارن بين النسخ (p99 والمسح الكامل للمرجع فقط، وتذبذبها عالٍ)
+COMPARED_METRICS = (
+    "cold_load_s", "warm_load_s", "index_build_s", "batch_5000_s", "dataset_mb", "rss_peak_mb",
+    "single_lookup.p50_us", "single_lookup.p95_us", "name_search.p50_us",
+    "render.first_run_s", "render.home_rerun.p50_us", "render.services_rerun.p50_us", "render.archive_rerun.p50_us",
+)
+# فرق مطلق أقل من هذا يُعد تذبذباً في القياس حسب الوحدة
+NOISE_FLOOR = {"_s": 0.02, "_us": 100, "_mb": 5}
+
+
+def percentiles(samples_s):
+    """p50/p95/p99 بالميكروثانية"""
+    arr = np.asarray(samples_s) * 1e6
+    return {f"p{q}_us": round(float(np.percentile(arr, q)), 1) for q in (50, 95, 99)}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def peak_rss_mb():
+    # ru_maxrss بالكيلوبايت على Linux وبالبايت على macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# ==============================================================================
+# السيناريو الواحد (داخل عملية منفصلة)
+# ==============================================================================
+
+def bench_file(path, render=False, seed=0):
+    """كل قياسات ملف واحد"""
+    cache_dir = tempfile.mkdtemp(prefix="alastal-bench-")
+    os.environ["ALASTAL_CACHE_DIR"] = cache_dir
+    from family_registry import batch, snapshot
+    from family_registry.compact import compact_frame
+    from family_registry.dataset import FamilyDataset
+    from family_registry.loader import load_data, normalize_columns, read_source
+    from family_registry.lookup import ID_COL, PHONE_COL, normalize_id
+    from family_registry.names import NAME_COL
+    snapshot.CACHE_DIR = cache_dir
+
+    out = {"file_bytes": os.path.getsize(path), "rss_start_mb": peak_rss_mb()}
+    try:
+        # تحميل بارد: تحليل الملف + توحيد الأعمدة + الضغط + بناء الفهارس
+        (raw, _), out["parse_s"] = timed(read_source, path)
+        df, out["normalize_s"] = timed(normalize_columns, raw)
+        del raw
+        (df, memory), out["compact_s"] = timed(compact_frame, df)
+        ds, out["index_build_s"] = timed(FamilyDataset, df)
+        out["cold_load_s"] = round(out["parse_s"] + out["normalize_s"] + out["compact_s"] + out["index_build_s"], 4)
+        out["rows"] = len(ds)
+        out["dataset_uncompacted_mb"] = round(memory["bytes_before"] / 2 ** 20, 1)
+        out["dataset_mb"] = round(memory["bytes_after"] / 2 ** 20, 1)
+        snapshot.save_snapshot(path, ds.df)
+        del ds, df
+
+        # تحميل دافئ: من اللقطة الثنائية (مع بناء الفهارس)
+        ds, out["warm_load_s"] = timed(load_data, path)
+
+        rng = np.random.default_rng(seed)
+        ids = normalize_id(ds.df[ID_COL]).to_numpy()
+        phones = ds.df[PHONE_COL].dropna().to_numpy() if PHONE_COL in ds.df.columns else ids
+        queries = np.concatenate([
+            rng.choice(ids, 1000), rng.choice(phones, 500),
+            (rng.integers(100_000_000, 999_999_999, 500)).astype(str),
+        ])
+
+        # البحث الفردي عبر الفهرس
+        lat = []
+        for q in queries:
+            _, dt = timed(ds.find, q)
+            lat.append(dt)
+        out["single_lookup"] = percentiles(lat)
+
+        # المرجع القديم: مسح كامل لعمود الهوية النصي لكل استعلام
+        id_column = pd.Series(ids)
+        lat = []
+        for q in queries[:50]:
+            _, dt = timed(lambda: id_column[id_column == q])
+            lat.append(dt)
+        out["single_lookup_scan"] = percentiles(lat)
+
+        if ds.names is not None:
+            names = ds.df[NAME_COL].dropna().to_numpy()
+            lat = []
+            for name in rng.choice(names, 200):
+                _, dt = timed(ds.search_name, " ".join(str(name).split()[:2]))
+                lat.append(dt)
+            out["name_search"] = percentiles(lat)
+
+        # التحقق الجماعي
+        batch_ids = np.concatenate([rng.choice(ids, 4500), rng.integers(100_000_000, 999_999_999, 500).astype(str)])
+        _, out["batch_5000_s"] = timed(batch.verify_ids, ds, batch_ids)
+
+        if render:
+            out["render"] = bench_render(path)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    out["rss_peak_mb"] = peak_rss_mb()
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in out.items()}
+
+
+def bench_render(path):
+    """زمن تشغيل سكربت Streamlit لكل صفحة (AppTest بدون متصفح)"""
+    from streamlit.testing.v1 import AppTest
+
+    site = tempfile.mkdtemp(prefix="alastal-site-")
+    ext = os.path.splitext(path)[1]
+    os.symlink(os.path.abspath(path), os.path.join(site, "data" + ext))
+    os.symlink(os.path.join(ROOT, "logo.jpg"), os.path.join(site, "logo.jpg"))
+    cwd = os.getcwd()
+    os.chdir(site)
+    try:
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=600)
+        _, first = timed(at.run)
+        out = {"first_run_s": round(first, 4)}
+        for page in ("home", "services", "archive"):
+            at.session_state.active_page = page
+            lat = [timed(at.run)[1] for _ in range(5)]
+            out[f"{page}_rerun"] = percentiles(lat)
+        return out
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(site, ignore_errors=True)
+
+
+# ==============================================================================
+# التشغيل والمقارنة
+# ==============================================================================
+
+def dataset_path(rows, variant, seed=0):
+    """ملف اصطناعي للحجم والصيغة المطلوبة (يُولَّد مرة ويُعاد استخدامه)"""
+    from benchmarks.synthetic import generate, write_export
+
+    fmt, encoding, delimiter = VARIANTS[variant]
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"synthetic-{rows}-{variant}-s{seed}.{fmt}")
+    if not os.path.exists(path):
+        write_export(generate(rows, seed=seed), path + ".tmp." + fmt, fmt, encoding, delimiter, seed)
+        os.replace(path + ".tmp." + fmt, path)
+    return path
+
+
+def run_scenario(path, render):
+    """تشغيل سيناريو في عملية بايثون جديدة"""
+    cmd = [sys.executable, "-m", "benchmarks.run", "--worker", path] + (["--render"] if render else [])
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1:] or ["unknown"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _flatten(d, prefix=""):
+    for k, v in d.items():
+        if isinstance(v, dict):
+            yield from _flatten(v, f"{prefix}{k}.")
+        elif isinstance(v, (int, float)):
+            yield f"{prefix}{k}", v
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """مقارنة بالنتائج السابقة: قائمة القياسات التي زادت أكثر من النسبة المسموحة"""
+    old = {r["scenario"]: dict(_flatten(r["metrics"])) for r in baseline.get("results", [])}
+    regressions = []
+    for r in current["results"]:
+        before = old.get(r["scenario"])
+        if not before:
+            continue
+        after = dict(_flatten(r["metrics"]))
+        for key in COMPARED_METRICS:
+            prev, value = before.get(key), after.get(key)
+            if not prev or value is None:
+                continue
+            floor = next((v for suffix, v in NOISE_FLOOR.items() if key.endswith(suffix)), 0)
+            if value > prev * (1 + threshold) and value - prev > floor:
+                regressions.append({"scenario": r["scenario"], "metric": key, "before": prev, "after": value, "ratio": round(value / prev, 2)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=["csv-utf8", "csv-cp1256", "xlsx"])
+    parser.add_argument("--render", action="store_true", help="قياس زمن عرض صفحات Streamlit أيضاً")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="ملف JSON للنتائج (افتراضياً stdout)")
+    parser.add_argument("--compare", help="ملف نتائج سابق للمقارنة")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="نسبة الزيادة المعتبرة تراجعاً")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(bench_file(args.worker, render=args.render, seed=args.seed)))
+        return 0
+
+    sys.path.insert(0, ROOT)
+    results = []
+    for rows in args.sizes:
+        for variant in args.variants:
+            # ملفات Excel الكبيرة بطيئة جداً في التوليد والقراءة عبر openpyxl
+            if VARIANTS[variant][0] == "xlsx" and rows > 200_000:
+                continue
+            path = dataset_path(rows, variant, args.seed)
+            scenario = f"{rows}-{variant}"
+            print(f"… {scenario}", file=sys.stderr)
+            results.append({"scenario": scenario, "metrics": run_scenario(path, args.render)})
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.threshold)
+        exit_code = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    for reg in report.get("regressions", []):
+        print(f"⚠ {reg['scenario']} {reg['metric']}: {reg['before']} -> {reg['after']} (x{reg['ratio']})", file=sys.stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
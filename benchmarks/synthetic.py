@@ -0,0 +1,147 @@
+"""مولّد سجلات عائلة اصطناعية لاختبارات الأداء.
+
+ينتج ملفات بنفس شكل تصدير مكتب العائلة: أسماء رباعية عربية متسلسلة (الابن يحمل اسم أبيه وجده)،
+أرقام هوية من 9 خانات بخانة تحقق صحيحة (مع نسبة أخطاء وتكرارات)، أرقام جوال بصيغ مختلفة،
+وأسماء أعمدة متنوعة من COL_MAP، بترميزات وفواصل مختلفة.
+
+    python -m benchmarks.synthetic 100000 --format csv --encoding windows-1256 -o benchmarks/data
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from family_registry.loader import COL_MAP
+
+MALE_NAMES = [
+    "محمد", "أحمد", "محمود", "خالد", "سامي", "يوسف", "إبراهيم", "عبد الله", "مصطفى", "رامي",
+    "حسن", "حسين", "علي", "عمر", "فادي", "ناصر", "جمال", "كمال", "وليد", "طارق", "زياد", "هاني",
+    "سليمان", "عبد الرحمن", "إسماعيل", "موسى", "عيسى", "صبحي", "قصي", "أسامة", "حمزة", "بلال",
+    "إياد", "نضال", "رائد", "ماهر", "عادل", "فايز", "توفيق", "شادي", "عبد الكريم", "منير",
+]
+FEMALE_NAMES = [
+    "فاطمة", "مريم", "آمنة", "عائشة", "خديجة", "سارة", "هدى", "نور", "ريم", "سلمى",
+    "أسماء", "رحمة", "إيمان", "منى", "سمية", "زينب", "هبة", "ولاء", "دعاء", "رنا",
+]
+FAMILY = "الأسطل"
+BRANCHES = ["آل علي", "آل حسن", "آل سليمان", "آل موسى", "آل عيسى", "آل إبراهيم", "آل مصطفى", "آل يوسف"]
+STATUSES = ["متزوج", "أعزب", "أرمل", "مطلق"]
+
+
+def id_check_digit(body):
+    """خانة التحقق لأرقام الهوية (8 خانات -> الخانة التاسعة) بطريقة Luhn المستخدمة في الهوية الفلسطينية"""
+    digits = (body[:, None] // 10 ** np.arange(7, -1, -1)) % 10
+    weighted = digits * np.array([1, 2, 1, 2, 1, 2, 1, 2])
+    total = (weighted // 10 + weighted % 10).sum(axis=1)
+    return (10 - total % 10) % 10
+
+
+def make_ids(rng, n):
+    """أرقام هوية فريدة من 9 خانات (تبدأ بـ 4 أو 8 أو 9) بخانة تحقق صحيحة"""
+    prefix = rng.choice([4, 8, 9], n) * 10_000_000
+    body = prefix + rng.choice(10_000_000, n, replace=False)
+    return body * 10 + id_check_digit(body)
+
+
+def format_phones(rng, n):
+    """أرقام جوال بصيغ مختلفة كما تظهر في الملفات الحقيقية"""
+    local = rng.choice([59, 56], n) * 10_000_000 + rng.integers(0, 10_000_000, n)
+    style = rng.integers(0, 5, n)
+    local_s = pd.Series(local).astype(str)
+    out = np.where(style == 0, "0" + local_s,
+          np.where(style == 1, "+970" + local_s,
+          np.where(style == 2, "00972" + local_s,
+          np.where(style == 3, "0" + local_s.str[:2] + "-" + local_s.str[2:5] + "-" + local_s.str[5:],
+                   ""))))
+    return out
+
+
+def generate(n, seed=0, duplicate_rate=0.002, bad_checksum_rate=0.001):
+    """جدول بأسماء الأعمدة الموحدة (قبل اختيار أسماء الأعمدة البديلة)"""
+    rng = np.random.default_rng(seed)
+
+    # سلاسل نسب: كل فرد يُنسب لأب من جيل سابق فيحمل الاسم الرباعي تسلسلاً حقيقياً
+    first = rng.choice(MALE_NAMES, n)
+    generations = max(4, int(np.log(max(n, 2)) / np.log(4)))
+    father = np.full(n, -1)
+    gen_bounds = np.linspace(0, n, generations + 1).astype(int)
+    for g in range(1, generations):
+        lo, hi = gen_bounds[g], gen_bounds[g + 1]
+        father[lo:hi] = rng.integers(gen_bounds[g - 1], gen_bounds[g], hi - lo)
+    # أسماء آباء وأجداد الجيل الأول (غير موجودين في السجل)
+    root_father = rng.choice(MALE_NAMES, n)
+    root_grand = rng.choice(MALE_NAMES, n)
+
+    has_father = father >= 0
+    f = np.where(has_father, father, 0)
+    father_name = np.where(has_father, first[f], root_father)
+    # اسم الجد = اسم أبي الأب كما يظهر في اسم الأب نفسه
+    grand_name = np.where(has_father, np.where(father[f] >= 0, first[father[f]], root_father[f]), root_grand)
+    names = pd.Series(first) + " " + father_name + " " + grand_name + " " + FAMILY
+
+    ids = make_ids(rng, n)
+    bad = rng.random(n) < bad_checksum_rate
+    ids[bad] = ids[bad] // 10 * 10 + (ids[bad] % 10 + 1) % 10
+    dup = rng.random(n) < duplicate_rate
+    ids[dup] = ids[rng.integers(0, n, dup.sum())]
+
+    married = rng.random(n) < 0.6
+    status = np.where(married, "متزوج", rng.choice(STATUSES[1:], n))
+    wife_ids = make_ids(rng, n)
+    # الفرع يُورث من الجد الأعلى
+    branch = rng.choice(BRANCHES, n)
+    for g in range(1, generations):
+        lo, hi = gen_bounds[g], gen_bounds[g + 1]
+        branch[lo:hi] = branch[father[lo:hi]]
+
+    return pd.DataFrame({
+        "رقم الهوية": ids.astype(str),
+        "الاسم": names,
+        "رقم الهاتف": format_phones(rng, n),
+        "الحالة الاجتماعية": status,
+        "عدد الافراد": np.where(married, rng.integers(2, 13, n), 1),
+        "هوية الزوجة": np.where(married, wife_ids.astype(str), ""),
+        "اسم الزوجة": np.where(married, pd.Series(rng.choice(FEMALE_NAMES, n)) + " " + rng.choice(MALE_NAMES, n), ""),
+        "الفرع": branch,
+    })
+
+
+def with_header_variants(df, rng):
+    """استبدال أسماء الأعمدة ببدائل عشوائية من COL_MAP (وبعضها بسطر جديد داخل الاسم كما في Excel)"""
+    renames = {}
+    for key, candidates in COL_MAP.items():
+        if key in df.columns:
+            name = candidates[rng.integers(0, len(candidates))]
+            renames[key] = name.replace(" ", "\n", 1) if rng.random() < 0.2 else name
+    return df.rename(columns=renames)
+
+
+def write_export(df, path, fmt="csv", encoding="utf-8", delimiter=",", seed=0):
+    """كتابة ملف تصدير بالصيغة والترميز المطلوبين"""
+    out = with_header_variants(df, np.random.default_rng(seed))
+    if fmt == "xlsx":
+        out.to_excel(path, index=False, engine="openpyxl")
+    else:
+        out.to_csv(path, index=False, encoding=encoding, sep=delimiter)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("--encoding", default="utf-8", help="utf-8 / utf-8-sig / windows-1256 ...")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output-dir", default=os.path.join("benchmarks", "data"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"synthetic-{args.rows}-{args.encoding}.{args.format}")
+    write_export(generate(args.rows, seed=args.seed), path, args.format, args.encoding, args.delimiter, args.seed)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""طبقة بيانات سجل عائلة الأسطل (مستقلة عن واجهة Streamlit)"""
+from .browse import BrowseIndex
+from .cache import ResultCache
+from .dataset import FamilyDataset
+from .loader import COL_MAP, POSSIBLE_FILES, current_version, find_data_file, find_data_files, load_data, load_sources
+from .lookup import LookupIndex, normalize_id, normalize_id_one, normalize_phone
+from .names import NameIndex, normalize_arabic
+from .quality import QualityReport
+from .reload import DataStore, diff_frames
+from .tree import FamilyTree
+
+__all__ = [
+    "BrowseIndex",
+    "COL_MAP",
+    "DataStore",
+    "POSSIBLE_FILES",
+    "FamilyDataset",
+    "FamilyTree",
+    "LookupIndex",
+    "NameIndex",
+    "QualityReport",
+    "ResultCache",
+    "current_version",
+    "diff_frames",
+    "find_data_file",
+    "find_data_files",
+    "load_data",
+    "load_sources",
+    "normalize_arabic",
+    "normalize_id",
+    "normalize_id_one",
+    "normalize_phone",
+]
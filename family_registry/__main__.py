@@ -0,0 +1,58 @@
+"""أدوات سطر الأوامر لطبقة البيانات: python -m family_registry <أمر>"""
+import argparse
+import json
+import sys
+
+from .loader import find_data_file
+
+
+def _data_path(path):
+    path = path or find_data_file()
+    if not path:
+        sys.exit("لم يتم العثور على ملف بيانات")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m family_registry")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    timing = commands.add_parser("snapshot-timing", help="مقارنة زمن التحميل من الملف المصدر ومن اللقطة الثنائية")
+    timing.add_argument("path", nargs="?", help="ملف البيانات (افتراضياً أول ملف موجود)")
+
+    api = commands.add_parser("serve-api", help="تشغيل واجهة HTTP للاستعلام (JSON) بجانب تطبيق Streamlit")
+    api.add_argument("path", nargs="?", help="ملف البيانات (افتراضياً كل المصادر الموجودة)")
+    api.add_argument("--host", default="127.0.0.1")
+    api.add_argument("--port", type=int, default=8600)
+    api.add_argument("--rate", type=float, default=10.0, help="عدد الطلبات المسموح بها في الثانية لكل عميل")
+    api.add_argument("--burst", type=int, default=30, help="أقصى دفعة طلبات متتالية لكل عميل")
+
+    export = commands.add_parser("export-static", help="تصدير حزمة ثابتة للاستعلام برقم الهوية (بدون خادم)")
+    export.add_argument("out_dir", help="مجلد الحزمة (يُحدَّث تزايدياً إذا كان موجوداً)")
+    export.add_argument("path", nargs="?", help="ملف البيانات (افتراضياً كل المصادر الموجودة)")
+    export.add_argument("--salt", help="الملح (افتراضياً ALASTAL_EXPORT_SALT أو ملح الحزمة الموجودة أو ملح عشوائي جديد)")
+    export.add_argument("--prefix-len", type=int, default=3, help="عدد الخانات الست عشرية لبادئة الشريحة")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot-timing":
+        from .snapshot import compare_startup
+        print(json.dumps(compare_startup(_data_path(args.path)), ensure_ascii=False, indent=2))
+    elif args.command == "serve-api":
+        from .api import serve
+        serve(args.host, args.port, args.path, rate=args.rate, burst=args.burst)
+    elif args.command == "export-static":
+        from .export import export_static
+        from .loader import load_data
+        dataset = load_data(args.path)
+        if dataset is None:
+            sys.exit("لم يتم العثور على ملف بيانات")
+        try:
+            report = export_static(dataset, args.out_dir, args.salt, args.prefix_len)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
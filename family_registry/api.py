@@ -0,0 +1,227 @@
+"""واجهة HTTP خفيفة (JSON) للاستعلام برقم الهوية أو هوية الزوجة أو الهاتف، بجانب تطبيق Streamlit.
+
+مخصصة للعملاء كثيري الطلبات (بوت واتساب، جداول اللجان) بدل جلسات Streamlit وإعادة التشغيل.
+تستخدم نفس المحمّل والفهارس (DataStore: لقطة ثنائية + إعادة تحميل في الخلفية) في ذاكرة العملية.
+
+    python -m family_registry serve-api --port 8600
+
+    GET /v1/lookup?q=401234567        البحث بالترتيب: الهوية ثم هوية الزوجة ثم الهاتف
+    GET /v1/id/401234567
+    GET /v1/wife/401234567
+    GET /v1/phone/0599123456
+    GET /v1/health
+    GET /v1/metrics                    (يتطلب رمز المشغل ALASTAL_OPS_TOKEN)
+
+إذا عُرّف ALASTAL_API_TOKEN تُقبل الطلبات فقط مع الترويسة Authorization: Bearer <الرمز>.
+Starlette و uvicorn يأتيان مع Streamlit؛ إن لم يتوفرا تبقى باقي الحزمة صالحة للاستخدام.
+"""
+import hmac
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from . import metrics
+from .batch import CARD_FIELDS
+from .cache import ResultCache
+from .lookup import ID_COL, PHONE_COL, WIFE_ID_COL, normalize_id_one
+from .reload import DataStore
+
+try:
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Route
+    HAS_STARLETTE = True
+except ImportError:
+    HAS_STARLETTE = False
+
+API_TOKEN_ENV = "ALASTAL_API_TOKEN"
+OPS_TOKEN_ENV = "ALASTAL_OPS_TOKEN"
+
+# اسم الحقل في المسار -> عمود الفهرس
+FIELDS = {"id": ID_COL, "wife": WIFE_ID_COL, "phone": PHONE_COL}
+# أسماء إنجليزية ثابتة في JSON لحقول البطاقة
+RECORD_KEYS = {
+    "الاسم": "name",
+    "رقم الهوية": "id",
+    "رقم الهاتف": "phone",
+    "الفرع": "branch",
+    "الحالة الاجتماعية": "marital_status",
+    "اسم الزوجة": "wife_name",
+}
+
+# نفس شرط صفحة الخدمات: 9 إلى 13 رقماً مع + اختيارية
+QUERY_PATTERN = re.compile(r"\+?\d{9,13}")
+
+# الحد الافتراضي لكل عميل: 10 طلبات/ثانية مع دفعة حتى 30
+RATE_PER_SECOND = 10.0
+RATE_BURST = 30
+CACHE_SIZE = 10_000
+CACHE_TTL = 60
+
+
+class RateLimiter:
+    """دلو رموز (token bucket) لكل عميل: يمتلئ بمعدل ثابت ويسمح بدفعة محدودة.
+
+    العملاء مرتبون حسب آخر طلب، فعند تجاوز max_clients يُحذف الأقدم أولاً ويبقى العدد محدوداً فعلاً.
+    """
+
+    def __init__(self, rate=RATE_PER_SECOND, burst=RATE_BURST, max_clients=100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client, now=None):
+        """يعيد (مسموح، ثوانٍ حتى الطلب التالي)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._prune(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / self.rate
+
+    def _prune(self, now):
+        # العملاء الذين امتلأ دلوهم من جديد لا حاجة لتذكرهم، ثم الأقدم طلباً حتى نعود تحت الحد
+        full_after = self.burst / self.rate
+        while self._buckets:
+            _, last = next(iter(self._buckets.values()))
+            if now - last < full_after and len(self._buckets) <= self.max_clients:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+def _token_matches(given, token):
+    """مقارنة رمز بزمن ثابت (كبايتات: compare_digest يرفض النصوص غير ASCII)"""
+    return hmac.compare_digest(given.encode("utf-8"), token.encode("utf-8"))
+
+
+def _json_value(value):
+    if value is None or value is pd.NA or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def record(row):
+    """صف السجل كقاموس JSON بحقول البطاقة فقط"""
+    out = {}
+    for col in CARD_FIELDS:
+        if col in row.index:
+            value = (normalize_id_one(row[col]) or None) if col == ID_COL else _json_value(row[col])
+            out[RECORD_KEYS[col]] = value
+    return out
+
+
+def lookup_payload(dataset, field, query):
+    """نتيجة الاستعلام كقاموس. field=None للبحث بالترتيب في كل الحقول"""
+    if dataset is None:
+        return 503, {"error": "data_unavailable"}
+    if not QUERY_PATTERN.fullmatch(query):
+        return 400, {"error": "invalid_query"}
+    with metrics.timer("api.lookup"):
+        if field is None:
+            column, positions = dataset.index.search(query)
+        else:
+            column, positions = FIELDS[field], dataset.index.get(FIELDS[field], query)
+        records = [record(row) for row in dataset.rows(positions)]
+    metrics.incr("lookup.found" if records else "lookup.not_found")
+    matched_by = next((k for k, c in FIELDS.items() if c == column), None) if records else None
+    return 200, {"found": bool(records), "matched_by": matched_by, "count": len(records), "records": records}
+
+
+def create_app(store=None, rate=RATE_PER_SECOND, burst=RATE_BURST, cache_size=CACHE_SIZE, cache_ttl=CACHE_TTL):
+    """تطبيق Starlette للاستعلام. store: DataStore مشترك (يُنشأ واحد إذا لم يُمرَّر)"""
+    if not HAS_STARLETTE:
+        raise RuntimeError("واجهة HTTP تحتاج starlette و uvicorn (pip install starlette uvicorn)")
+
+    store = store or DataStore(poll_interval=30)
+    limiter = RateLimiter(rate, burst)
+    cache = ResultCache("api.cache", cache_size, cache_ttl)
+    api_token = os.environ.get(API_TOKEN_ENV, "")
+    ops_token = os.environ.get(OPS_TOKEN_ENV, "")
+
+    def respond(status, payload, headers=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+    def bearer(request):
+        auth = request.headers.get("authorization", "")
+        return auth[7:] if auth.lower().startswith("bearer ") else ""
+
+    def guard(request):
+        """الرمز ثم حد الطلبات. يعيد استجابة رفض أو None"""
+        if api_token and not _token_matches(bearer(request), api_token):
+            metrics.incr("api.unauthorized")
+            return respond(401, {"error": "unauthorized"})
+        client = request.client.host if request.client else "-"
+        allowed, retry_after = limiter.allow(client)
+        if not allowed:
+            metrics.incr("api.rate_limited")
+            return respond(429, {"error": "rate_limited"}, {"Retry-After": str(math.ceil(retry_after))})
+        return None
+
+    async def lookup(request):
+        started = time.perf_counter()
+        try:
+            denied = guard(request)
+            if denied is not None:
+                return denied
+            field = request.path_params.get("field")
+            if field is not None and field not in FIELDS:
+                return respond(404, {"error": "unknown_field"})
+            query = (request.path_params.get("value") or request.query_params.get("q") or "").strip()
+
+            dataset = store.dataset
+            version = dataset.version if dataset is not None else None
+            body = cache.get((field, query), version)
+            if body is None:
+                status, payload = lookup_payload(dataset, field, query)
+                if status != 200:
+                    return respond(status, payload)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                cache.put((field, query), body, version)
+            return respond(200, body, {"Cache-Control": f"private, max-age={cache.ttl}"})
+        finally:
+            metrics.observe("api.request", time.perf_counter() - started)
+
+    async def health(request):
+        dataset = store.dataset
+        return respond(200 if dataset is not None else 503, {
+            "status": "ok" if dataset is not None else "data_unavailable",
+            "rows": len(dataset) if dataset is not None else 0,
+            "last_reload": store.last_reload,
+        })
+
+    async def metrics_view(request):
+        if not ops_token or not _token_matches(bearer(request), ops_token):
+            return respond(401, {"error": "unauthorized"})
+        return respond(200, {**metrics.snapshot(), "cache": cache.stats()})
+
+    return Starlette(routes=[
+        Route("/v1/lookup", lookup),
+        Route("/v1/{field}/{value}", lookup),
+        Route("/v1/health", health),
+        Route("/v1/metrics", metrics_view),
+    ])
+
+
+def serve(host="127.0.0.1", port=8600, file_path=None, **options):
+    """تشغيل الخادم (عملية واحدة؛ الفهارس في ذاكرتها). للتشغيل بجانب Streamlit على منفذ آخر"""
+    import uvicorn
+
+    app = create_app(DataStore(file_path, poll_interval=30), **options)
+    uvicorn.run(app, host=host, port=port, log_level="warning", access_log=False)
@@ -0,0 +1,113 @@
+"""التحقق الجماعي من أرقام الهوية: قائمة ملصوقة أو ملف CSV/XLSX -> ملف نتائج قابل للتنزيل."""
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .ingest import sniff_delimiter, sniff_encoding
+from .loader import COL_MAP
+from .lookup import ID_COL, normalize_id
+
+# نفس حقول بطاقة النتيجة في صفحة الخدمات
+CARD_FIELDS = ["الاسم", "رقم الهوية", "رقم الهاتف", "الفرع", "الحالة الاجتماعية", "اسم الزوجة"]
+
+# حد أعلى لحجم الدفعة الواحدة (حماية من تفريغ السجل كاملاً)
+MAX_BATCH = 5000
+
+ROW_COL = "#"
+INPUT_COL = "المدخل"
+STATUS_COL = "الحالة"
+MATCHES_COL = "عدد السجلات"
+
+STATUS_INVALID = "رقم غير صالح"
+STATUS_NOT_FOUND = "غير موجود"
+STATUS_FOUND = "موجود"
+STATUS_DUPLICATE = "مكرر"
+
+
+def parse_id_list(text):
+    """تقسيم نص ملصوق (أسطر، فواصل، مسافات) إلى قائمة أرقام"""
+    return [part for part in re.split(r"[\s,;،]+", text or "") if part]
+
+
+def read_id_file(data, filename):
+    """قراءة أرقام الهوية من ملف مرفوع (bytes). يُختار عمود الهوية حسب COL_MAP وإلا أول عمود"""
+    def read(header):
+        if filename.lower().endswith((".xlsx", ".xls")):
+            return pd.read_excel(io.BytesIO(data), dtype=str, header=header)
+        encoding = sniff_encoding(data[:64 * 1024])
+        text = data.decode(encoding, errors="replace")
+        return pd.read_csv(io.StringIO(text), dtype=str, header=header, sep=sniff_delimiter(text[:8192]))
+
+    df = read(0)
+    names = [str(c).strip() for c in df.columns]
+    for cand in COL_MAP[ID_COL]:
+        if cand in names:
+            return df.iloc[:, names.index(cand)].tolist()
+    # ملف بدون عناوين: أول خلية رقم هوية وليست اسم عمود
+    if names and re.fullmatch(r"[\d\s.-]+", names[0]):
+        df = read(None)
+    return df.iloc[:, 0].tolist() if len(df.columns) else []
+
+
+def verify_ids(dataset, values):
+    """التحقق من قائمة أرقام بعملية موحدة واحدة ودمج واحد مع السجل.
+
+    يعيد جدولاً بنفس ترتيب المدخلات: رقم السطر، المدخل، الحالة، عدد السجلات، وحقول البطاقة.
+    رقم الهوية المكرر في السجل يظهر بعدد سجلاته.
+    """
+    with metrics.timer("lookup.batch"):
+        return _verify_ids(dataset, values)
+
+
+def _verify_ids(dataset, values):
+    raw = pd.Series(list(values)[:MAX_BATCH], dtype=object).fillna("").astype(str).str.strip()
+    digits = raw.str.replace(r"\.0$", "", regex=True).str.replace(r"\D", "", regex=True)
+    # 9 خانات (أو 8 إذا حذف Excel الصفر البادئ) وبدون حروف
+    valid = digits.str.len().isin([8, 9]) & ~raw.str.contains(r"[^\d\s.\-]", regex=True)
+    keys = normalize_id(raw.to_numpy()).where(valid.to_numpy(), None)
+
+    request = pd.DataFrame({ROW_COL: np.arange(1, len(raw) + 1), INPUT_COL: raw.to_numpy(), "_key": keys.to_numpy()})
+
+    df = dataset.df if dataset is not None else None
+    if df is None or ID_COL not in df.columns:
+        # لا توجد بيانات أو لم يُتعرف على عمود الهوية في الملف: كل رقم صالح "غير موجود"
+        df = pd.DataFrame(columns=[ID_COL])
+    registry = df[[c for c in CARD_FIELDS if c in df.columns]]
+    if pd.api.types.is_integer_dtype(registry[ID_COL].dtype):
+        # عمود الهوية مضغوط كأعداد: الدمج على الأعداد ثم إعادة الخانات التسع للعرض
+        request["_key"] = pd.to_numeric(request["_key"]).astype(registry[ID_COL].dtype)
+    counts = registry[ID_COL].value_counts()
+    result = request.merge(registry, how="left", left_on="_key", right_on=ID_COL, sort=False)
+    result = result.sort_values(ROW_COL, kind="stable")
+    if ID_COL in result.columns:
+        result[ID_COL] = normalize_id(result[ID_COL]).to_numpy()
+
+    matches = result["_key"].map(counts).fillna(0).astype(int)
+    result[MATCHES_COL] = matches.to_numpy()
+    result[STATUS_COL] = np.select(
+        [result["_key"].isna(), matches == 0, matches == 1],
+        [STATUS_INVALID, STATUS_NOT_FOUND, STATUS_FOUND],
+        default=STATUS_DUPLICATE,
+    )
+    columns = [ROW_COL, INPUT_COL, STATUS_COL, MATCHES_COL] + [c for c in CARD_FIELDS if c in result.columns]
+    return result[columns].reset_index(drop=True)
+
+
+def summarize(result):
+    """عدد المدخلات لكل حالة (المكرر يُحسب مرة واحدة لكل مدخل)"""
+    per_input = result.drop_duplicates(subset=ROW_COL)
+    return per_input[STATUS_COL].value_counts().to_dict()
+
+
+def to_csv_bytes(result):
+    """ملف CSV بترميز utf-8-sig ليفتحه Excel بالعربية مباشرة"""
+    return result.to_csv(index=False).encode("utf-8-sig")
+
+
+def to_xlsx_bytes(result):
+    buf = io.BytesIO()
+    result.to_excel(buf, index=False, engine="openpyxl")
+    return buf.getvalue()
@@ -0,0 +1,120 @@
+"""تصفح السجل بالفلاتر (الفرع، الحالة الاجتماعية، عدد الأفراد) مع تقسيم النتائج إلى صفحات.
+
+لكل عمود فلتر يُبنى عند التحميل (مرة واحدة لكل نسخة بيانات):
+- رمز القيمة لكل صف (int32)،
+- مواقع صفوف كل قيمة متجاورة ومرتبة (CSR: المواقع مرتبة حسب الرمز + بداية كل قيمة)،
+- عدد صفوف كل قيمة.
+
+الفلتر الواحد = دمج قوائم مواقع القيم المختارة. الفلاتر المجتمعة = تقاطع: تُؤخذ أصغر مجموعة مرشحة
+ثم تُبقى منها الصفوف التي يقع رمزها في القيم المختارة لباقي الأعمدة، فلا يُمر على كل السجل أبداً.
+الأعداد لكل قيمة بدون فلتر محسوبة مسبقاً، ومع فلتر تُحسب من الصفوف المطابقة فقط.
+الصفحة تُقتطع من المواقع المطابقة، ولا يُبنى جدول إلا لصفوف الصفحة المعروضة.
+"""
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .compact import COUNT_COL
+from .lookup import ID_COL, normalize_id
+from .tree import BRANCH_COL
+
+MARITAL_COL = "الحالة الاجتماعية"
+FILTER_COLUMNS = (BRANCH_COL, MARITAL_COL, COUNT_COL)
+# أعمدة جدول الصفحة بالترتيب
+PAGE_COLUMNS = ["الاسم", ID_COL, "رقم الهاتف", BRANCH_COL, MARITAL_COL, COUNT_COL, "اسم الزوجة"]
+MISSING = "غير محدد"
+PAGE_SIZE = 50
+
+
+class Facet:
+    """فهرس عمود فلتر واحد: رمز القيمة لكل صف، ومواقع صفوف كل قيمة، وعددها"""
+
+    def __init__(self, labels, codes):
+        self.labels = labels
+        self.codes = codes
+        self.code_of = {label: code for code, label in enumerate(labels)}
+        counts = np.bincount(codes, minlength=len(labels))
+        self.order = np.argsort(codes, kind="stable").astype(np.int32)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+        self.counts = pd.Series(counts, index=pd.Index(labels, dtype=object), name="العدد")
+
+    @classmethod
+    def from_series(cls, series, numeric=False):
+        if numeric:
+            series = pd.to_numeric(pd.Series(series.array), errors="coerce")
+        # القيم مرتبة (أبجدياً أو عددياً)، والفارغ قيمة مستقلة في النهاية
+        codes, uniques = pd.factorize(series, sort=True)
+        labels = [int(v) if numeric and float(v).is_integer() else (v if numeric else str(v)) for v in uniques]
+        missing = codes < 0
+        if missing.any():
+            codes = np.where(missing, len(labels), codes)
+            labels.append(MISSING)
+        return cls(labels, codes.astype(np.int32))
+
+    def positions(self, codes):
+        """مواقع الصفوف (مرتبة) التي قيمتها ضمن الرموز المعطاة"""
+        parts = [self.order[self.offsets[c]:self.offsets[c + 1]] for c in codes]
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.int32)
+
+    def memory_usage(self):
+        return int(self.codes.nbytes + self.order.nbytes + self.offsets.nbytes)
+
+
+class BrowseIndex:
+    """فهارس الفلاتر لنسخة بيانات، مع اختيار الصفوف المطابقة واقتطاع الصفحات"""
+
+    def __init__(self, facets, rows):
+        self.facets = facets
+        self.rows = rows
+
+    @classmethod
+    def from_frame(cls, df):
+        facets = {
+            col: Facet.from_series(df[col], numeric=col == COUNT_COL)
+            for col in FILTER_COLUMNS if col in df.columns
+        }
+        return cls(facets, len(df))
+
+    def select(self, filters):
+        """مواقع الصفوف المطابقة لكل الفلاتر (مرتبة حسب ترتيب السجل).
+
+        filters: {العمود: [القيم المختارة]}؛ القائمة الفارغة تعني بدون فلتر على العمود.
+        """
+        chosen = [
+            (self.facets[col], [self.facets[col].code_of[v] for v in values if v in self.facets[col].code_of])
+            for col, values in filters.items() if values and col in self.facets
+        ]
+        if not chosen:
+            return np.arange(self.rows, dtype=np.int32)
+        with metrics.timer("browse.select"):
+            # نبدأ بأصغر مجموعة مرشحة، ثم التقاطع مع باقي الفلاتر عبر رموز الصفوف المرشحة فقط
+            chosen.sort(key=lambda item: int(item[0].counts.iloc[item[1]].sum()))
+            facet, codes = chosen[0]
+            positions = facet.positions(codes)
+            for facet, codes in chosen[1:]:
+                if not len(positions):
+                    break
+                positions = positions[np.isin(facet.codes[positions], codes)]
+        return positions
+
+    def counts(self, col, positions=None):
+        """عدد الصفوف لكل قيمة في العمود: محسوب مسبقاً لكل السجل، أو للصفوف المطابقة فقط"""
+        facet = self.facets[col]
+        if positions is None or len(positions) == self.rows:
+            return facet.counts
+        counts = np.bincount(facet.codes[positions], minlength=len(facet.labels))
+        return pd.Series(counts, index=facet.counts.index, name=facet.counts.name)
+
+    def page(self, df, positions, page, page_size=PAGE_SIZE):
+        """جدول صفحة واحدة (page تبدأ من 1) من الصفوف المطابقة"""
+        start = (page - 1) * page_size
+        window = positions[start:start + page_size]
+        table = df.iloc[window][[c for c in PAGE_COLUMNS if c in df.columns]].reset_index(drop=True)
+        if ID_COL in table.columns:
+            table[ID_COL] = normalize_id(table[ID_COL]).to_numpy()
+        return table
+
+    def memory_usage(self):
+        return sum(facet.memory_usage() for facet in self.facets.values())
@@ -0,0 +1,102 @@
+"""ذاكرة مؤقتة مشتركة داخل العملية لنتائج الاستعلام الجاهزة (بطاقات HTML أو استجابات JSON).
+
+- LRU بعدد أقصى من المدخلات وحد تقريبي للحجم بالبايت، ومدة صلاحية لكل مدخل، فلا تكبر الذاكرة
+  مهما كثرت الأرقام المختلفة المطلوبة (محاولات الاستخراج بالتجريب).
+- نتائج "غير موجود" تُخزن أيضاً (قيمتها صغيرة).
+- كل مدخل ينتمي لنسخة البيانات التي بُني منها: أول طلب بنسخة جديدة يفرغ الذاكرة كاملة.
+- العدادات في metrics: <الاسم>.hit و <الاسم>.miss (لـ metrics.hit_ratio) و evicted و invalidated.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics
+
+CACHE_SIZE = 10_000
+CACHE_TTL = 600
+CACHE_BYTES = 32 * 2**20
+
+
+def _size(value):
+    """حجم تقريبي للقيمة بالبايت (مع عناصرها إن كانت tuple)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, tuple):
+        size += sum(_size(v) for v in value)
+    return size
+
+
+class ResultCache:
+    """ذاكرة LRU بمدة صلاحية وحد للحجم، مفتاحها الاستعلام وتُفرَّغ عند تغيّر نسخة البيانات"""
+
+    def __init__(self, name, max_size=CACHE_SIZE, ttl=CACHE_TTL, max_bytes=CACHE_BYTES):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._version = None
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync(self, version):
+        if version != self._version:
+            if self._items:
+                metrics.incr(f"{self.name}.invalidated")
+            self._items.clear()
+            self.bytes = 0
+            self._version = version
+
+    def get(self, key, version=None):
+        """القيمة المخزنة أو None"""
+        with self._lock:
+            self._sync(version)
+            item = self._items.get(key)
+            if item is not None and item[0] < time.monotonic():
+                self._items.pop(key)
+                self.bytes -= item[2]
+                item = None
+            if item is None:
+                metrics.incr(f"{self.name}.miss")
+                return None
+            self._items.move_to_end(key)
+        metrics.incr(f"{self.name}.hit")
+        return item[1]
+
+    def put(self, key, value, version=None):
+        size = _size(key) + _size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._sync(version)
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._items[key] = (time.monotonic() + self.ttl, value, size)
+            self.bytes += size
+            evicted = 0
+            while len(self._items) > self.max_size or self.bytes > self.max_bytes:
+                _, (_, _, dropped) = self._items.popitem(last=False)
+                self.bytes -= dropped
+                evicted += 1
+        if evicted:
+            metrics.incr(f"{self.name}.evicted", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """ملخص للعرض في صفحة القياسات"""
+        counters = metrics.snapshot()["counters"]
+        return {
+            "entries": len(self._items),
+            "bytes": self.bytes,
+            "max_size": self.max_size,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": metrics.hit_ratio(counters, self.name),
+        }
+
+    def __len__(self):
+        return len(self._items)
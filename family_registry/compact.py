@@ -0,0 +1,107 @@
+"""ضغط جدول السجل في الذاكرة بعد توحيد الأعمدة.
+
+- أرقام الهوية وهوية الزوجة: أعداد صحيحة UInt32 (4 بايت + قناع الفارغ) بدل نصوص، والصفر البادئ
+  يُستعاد عند العرض عبر normalize_id / normalize_id_one. العمود الذي فيه أرقام معيبة يبقى نصاً.
+- الأعمدة قليلة القيم المختلفة (الحالة الاجتماعية، الفرع...): Categorical.
+- عدد الأفراد: عدد صحيح صغير.
+- باقي النصوص: نصوص Arrow بدل كائنات بايثون (إن توفر pyarrow).
+- الأعمدة التي لا تقرؤها الواجهة ولا الفهارس تُحذف.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .lookup import ID_COL, ID_LENGTHS, WIFE_ID_COL, id_digits, id_has_symbols, normalize_id
+from .snapshot import HAS_ARROW
+
+logger = logging.getLogger(__name__)
+
+# الأعمدة التي تقرؤها الواجهة والفهارس؛ غيرها يُحذف بعد التحميل
+KEEP_COLUMNS = ["الاسم", "رقم الهوية", "رقم الهاتف", "الحالة الاجتماعية", "عدد الافراد", "هوية الزوجة", "اسم الزوجة", "الفرع"]
+ID_COLUMNS = (ID_COL, WIFE_ID_COL)
+COUNT_COL = "عدد الافراد"
+
+# عمود نصي يصبح Categorical إذا كانت قيمه المختلفة أقل من هذه النسبة من عدد الصفوف
+CATEGORY_MAX_RATIO = 0.5
+
+try:
+    # نفس نوع النص الافتراضي في pandas 3 (قيمة الفارغ NaN وليست pd.NA)
+    TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan) if HAS_ARROW else None
+except TypeError:
+    # pandas < 2.3
+    TEXT_DTYPE = None
+
+
+def _ids_to_uint(values):
+    """أرقام الهوية كـ UInt32 (الفارغ -> NA).
+
+    يعيد None فيبقى العمود نصاً كما أُدخل إذا وُجد رقم ليس 8 أو 9 خانات أو فيه حروف أو رموز:
+    العدد يفقد الأصفار البادئة والحروف، فلا يستطيع فحص الجودة بعدها التمييز بين 012345678 و 12345678.
+    """
+    lengths = id_digits(values).str.len()
+    if (~lengths.isin((0,) + ID_LENGTHS)).any() or id_has_symbols(values).any():
+        return None
+    ids = normalize_id(values)
+    return pd.to_numeric(ids.where(ids != "", None)).astype("UInt32")
+
+
+def _smallest_int(values):
+    """عدد الأفراد بأصغر نوع صحيح يتسع للقيم (القيم غير الرقمية -> NA)"""
+    numbers = pd.to_numeric(pd.Series(values), errors="coerce")
+    present = numbers.dropna()
+    if len(present) and (present % 1 != 0).any():
+        return numbers.astype("float32")
+    low, high = (present.min(), present.max()) if len(present) else (0, 0)
+    for dtype, info in (("UInt8", np.iinfo(np.uint8)), ("UInt16", np.iinfo(np.uint16)), ("Int32", np.iinfo(np.int32))):
+        if info.min <= low and high <= info.max:
+            return numbers.astype(dtype)
+    return numbers.astype("Int64")
+
+
+def _compact_text(series):
+    if len(series) and series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(series):
+        return series.astype(str).where(series.notna()).astype("category")
+    if TEXT_DTYPE is not None and series.dtype == object:
+        return series.astype(str).where(series.notna()).astype(TEXT_DTYPE)
+    return series
+
+
+def compact_frame(df):
+    """ضغط الجدول. يعيد (الجدول الجديد، تقرير الذاكرة قبل وبعد بالبايت)"""
+    before = int(df.memory_usage(deep=True).sum())
+
+    # لا يُحذف شيء إذا لم يُتعرف على عمود الهوية (ملف بأسماء أعمدة غير معروفة)
+    dropped = [c for c in df.columns if c not in KEEP_COLUMNS] if ID_COL in df.columns else []
+    df = df.drop(columns=dropped)
+
+    columns = {}
+    for col in df.columns:
+        if col in ID_COLUMNS:
+            ids = _ids_to_uint(df[col])
+            columns[col] = ids if ids is not None else df[col]
+        elif col == COUNT_COL:
+            columns[col] = _smallest_int(df[col].to_numpy())
+        elif pd.api.types.is_numeric_dtype(df[col].dtype):
+            columns[col] = df[col]
+        else:
+            columns[col] = _compact_text(df[col])
+    df = pd.DataFrame(columns, index=pd.RangeIndex(len(df)))
+
+    after = int(df.memory_usage(deep=True).sum())
+    report = {
+        "bytes_before": before,
+        "bytes_after": after,
+        "dropped_columns": dropped,
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+    }
+    logger.info("ضغط جدول السجل: %.1f MB -> %.1f MB (حُذف %d عمود)", before / 2 ** 20, after / 2 ** 20, len(dropped))
+    return df, report
+
+
+def restore_categories(df, like):
+    """إعادة الأعمدة التي كانت Categorical في like (الدمج بين فئات مختلفة يحولها لنصوص)"""
+    for col, dtype in like.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
@@ -0,0 +1,89 @@
+from . import metrics
+from .browse import BrowseIndex
+from .lookup import ID_COL, LookupIndex
+from .names import NAME_COL, NameIndex
+from .quality import QualityReport
+from .tree import FamilyTree
+
+
+class FamilyDataset:
+    """بيانات العائلة المحمّلة مع الفهارس المبنية عليها (تُبنى مرة واحدة لكل نسخة بيانات)"""
+
+    # يُمرَّر بدل فهرس الأسماء أو الشجرة أو تقرير الجودة أو فهارس التصفح لبنائها من الجدول
+    BUILD = object()
+    # أسماء الفهارس كما تُمرَّر للمنشئ (وتُحفظ بجانب لقطة الجدول)
+    INDEXES = ("index", "names", "tree", "quality", "browse")
+
+    def __init__(self, df, version=None, source="", load_report=None, index=None, names=BUILD, tree=BUILD,
+                 quality=BUILD, browse=BUILD):
+        self.df = df
+        self.version = version
+        self.source = source
+        self.load_report = load_report or {}
+        # الفهارس تُمرَّر جاهزة عند إعادة التحميل التزايدية، وإلا تُبنى من الجدول
+        self.index = index if index is not None else LookupIndex.from_frame(df)
+        if names is self.BUILD:
+            names = NameIndex.from_series(df[NAME_COL]) if NAME_COL in df.columns else None
+        self.names = names
+        if tree is self.BUILD:
+            with metrics.timer("tree.build"):
+                tree = FamilyTree.from_frame(df) if NAME_COL in df.columns else None
+        self.tree = tree
+        if quality is self.BUILD:
+            with metrics.timer("quality.validate"):
+                quality = QualityReport.from_frame(df)
+        self.quality = quality
+        if browse is self.BUILD:
+            with metrics.timer("browse.build"):
+                browse = BrowseIndex.from_frame(df)
+        self.browse = browse
+        self._memory = None
+
+    def indexes(self):
+        """الفهارس المبنية كقاموس يُمرَّر للمنشئ كما هو: FamilyDataset(df, **dataset.indexes())"""
+        return {name: getattr(self, name) for name in self.INDEXES}
+
+    def rows(self, positions):
+        """الصفوف المقابلة لمواقع الفهرس"""
+        return [self.df.iloc[p] for p in positions]
+
+    def find(self, query):
+        """البحث برقم الهوية أو هوية الزوجة أو الهاتف. يعيد (الحقل، الصفوف)"""
+        with metrics.timer("lookup.find"):
+            field, positions = self.index.search(query)
+            rows = self.rows(positions)
+        metrics.incr("lookup.found" if rows else "lookup.not_found")
+        return field, rows
+
+    def find_id(self, search_id):
+        """البحث برقم الهوية فقط"""
+        return self.rows(self.index.get(ID_COL, search_id))
+
+    def search_name(self, query, k=10):
+        """البحث التقريبي بالاسم. يعيد قائمة (الصف، درجة التطابق)"""
+        if self.names is None:
+            return []
+        with metrics.timer("lookup.name"):
+            return [(self.df.iloc[pos], score) for pos, score in self.names.search(query, k=k)]
+
+    def lineage(self, row):
+        """سلسلة نسب صف (بموقعه في الجدول). يعيد (العقد، أسماء الأجداد غير المسجلين) أو None"""
+        if self.tree is None or not 0 <= row < len(self.tree.person_of_row):
+            return None
+        return self.tree.lineage(row)
+
+    def memory_usage(self):
+        """حجم البيانات والفهارس في الذاكرة بالبايت (يُحسب مرة واحدة لأن النسخة لا تتغير)"""
+        if self._memory is None:
+            self._memory = {
+                "table": int(self.df.memory_usage(deep=True).sum()),
+                "lookup_index": self.index.memory_usage(),
+                "name_index": self.names.memory_usage() if self.names is not None else 0,
+                "family_tree": self.tree.memory_usage() if self.tree is not None else 0,
+                "quality_report": self.quality.memory_usage(),
+                "browse_index": self.browse.memory_usage(),
+            }
+        return self._memory
+
+    def __len__(self):
+        return len(self.df)
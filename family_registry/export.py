@@ -0,0 +1,283 @@
+"""تصدير ثابت للاستعلام برقم الهوية بدون خادم بايثون (للطوارئ أو الخدمة من CDN).
+
+    python -m family_registry export-static site-static/
+
+الحزمة الناتجة:
+    index.html        صفحة استعلام صغيرة تعمل في المتصفح
+    config.json       الملح وطول بادئة الشرائح ونسخة الحزمة
+    shards/<ب>.json   سجلات كل الهويات التي تبدأ بصمتها بالبادئة <ب>
+    manifest.json     بصمة محتوى كل شريحة (للتوليد التزايدي)
+
+لكل رقم هوية: بصمة البحث = SHA-256(الملح:الرقم). أول خانات البصمة تحدد الشريحة، وباقيها مفتاح السجل داخلها،
+فلا تظهر أرقام الهوية في أي ملف ويُنزَّل لكل استعلام ملف شريحة صغير واحد.
+بيانات السجل مشفرة بمفتاح مشتق من الرقم نفسه (HMAC-SHA256 كتيار تشفير، مع وسم تحقق)، فلا تُقرأ الأسماء
+والهواتف بالجملة من الملفات إلا بمعرفة أرقام الهوية. هذا يصعّب الاستخراج العشوائي فقط: مساحة الأرقام
+(10^9) قابلة للتجريب الشامل، لذلك لا تُنشر الحزمة إلا حيث يُقبل نشر بطاقة الاستعلام العادية.
+
+التوليد تزايدي: المحتوى حتمي (نفس السجلات -> نفس البايتات)، فتُكتب فقط الشرائح التي تغيرت بصمتها
+وتُحذف الشرائح التي لم يعد فيها سجلات. تغيير الملح أو طول البادئة يعيد توليد كل الشرائح.
+يحتاج المتصفح سياقاً آمناً (https أو localhost) لاستخدام WebCrypto.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .api import RECORD_KEYS
+from .batch import CARD_FIELDS
+from .lookup import ID_COL, normalize_id
+
+logger = logging.getLogger(__name__)
+
+# 3 خانات ست عشرية = 4096 شريحة (نحو 250 سجلاً لكل شريحة لسجل من مليون)
+PREFIX_LEN = 3
+ENTRY_LEN = 16
+NONCE_LEN = 12
+SALT_ENV = "ALASTAL_EXPORT_SALT"
+SHARDS_DIR = "shards"
+
+
+def _lookup_hash(salt, id_):
+    return hashlib.sha256(f"{salt}:{id_}".encode()).hexdigest()
+
+
+def _record_key(salt, id_):
+    return hashlib.sha256(f"key:{salt}:{id_}".encode()).digest()
+
+
+def _keystream(key, nonce, length):
+    blocks = (length + 31) // 32
+    return b"".join(hmac.new(key, nonce + i.to_bytes(4, "big"), "sha256").digest() for i in range(blocks))[:length]
+
+
+def seal(key, plaintext):
+    """تشفير حتمي: الوسم = HMAC(المفتاح، النص) يُستخدم كـ nonce للتيار ويتحقق منه المتصفح بعد فك التشفير"""
+    nonce = hmac.new(key, plaintext, "sha256").digest()[:NONCE_LEN]
+    stream = _keystream(key, nonce, len(plaintext))
+    cipher = (int.from_bytes(plaintext, "big") ^ int.from_bytes(stream, "big")).to_bytes(len(plaintext), "big")
+    return base64.b64encode(nonce + cipher).decode("ascii")
+
+
+def unseal(key, sealed):
+    """عكس seal (للاختبار من بايثون). يعيد None إذا لم يطابق الوسم"""
+    data = base64.b64decode(sealed)
+    nonce, cipher = data[:NONCE_LEN], data[NONCE_LEN:]
+    stream = _keystream(key, nonce, len(cipher))
+    plaintext = (int.from_bytes(cipher, "big") ^ int.from_bytes(stream, "big")).to_bytes(len(cipher), "big")
+    return plaintext if hmac.compare_digest(hmac.new(key, plaintext, "sha256").digest()[:NONCE_LEN], nonce) else None
+
+
+def _card_columns(df):
+    """أعمدة البطاقة كقوائم بايثون (الفارغ -> None، الهوية بخاناتها التسع)"""
+    columns = {}
+    for col in CARD_FIELDS:
+        if col not in df.columns:
+            continue
+        if col == ID_COL:
+            values = normalize_id(df[col])
+        else:
+            values = df[col].astype(object).where(df[col].notna(), None)
+        columns[RECORD_KEYS[col]] = values.tolist()
+    return columns
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def export_static(dataset, out_dir, salt=None, prefix_len=PREFIX_LEN):
+    """كتابة الحزمة الثابتة أو تحديثها تزايدياً. يعيد تقريراً بعدد الشرائح المكتوبة والمحذوفة.
+
+    يرفع ValueError إذا لم يُتعرف على عمود رقم الهوية في البيانات (قبل كتابة أي ملف).
+    """
+    if ID_COL not in dataset.df.columns:
+        raise ValueError(f"لا يوجد عمود '{ID_COL}' في البيانات، لا يمكن بناء الحزمة")
+    started = time.perf_counter()
+    shards_dir = os.path.join(out_dir, SHARDS_DIR)
+    os.makedirs(shards_dir, exist_ok=True)
+    # الملح يُحفظ مع الحزمة ويُعاد استخدامه، وإلا تتغير كل الشرائح في كل تصدير
+    salt = salt or os.environ.get(SALT_ENV) or (_read_json(os.path.join(out_dir, "config.json")) or {}).get("salt")
+    salt = salt or secrets.token_hex(16)
+    old_manifest = (_read_json(os.path.join(out_dir, "manifest.json")) or {}).get("shards", {})
+
+    df = dataset.df
+    ids = normalize_id(df[ID_COL]).to_numpy(dtype=object)
+    valid = np.flatnonzero(pd.Series(ids).str.len().to_numpy() == 9)
+    codes, unique_ids = pd.factorize(ids[valid])
+    columns = _card_columns(df)
+    names = list(columns)
+
+    with metrics.timer("export.hash"):
+        lookups = [_lookup_hash(salt, i) for i in unique_ids]
+    # صفوف كل رقم هوية متجاورة، والأرقام مرتبة حسب بصمتها (أي حسب الشريحة)
+    rows_by_code = valid[np.argsort(codes, kind="stable")]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(unique_ids)))))
+    order = sorted(range(len(unique_ids)), key=lookups.__getitem__)
+
+    manifest, written, records = {}, 0, 0
+    i = 0
+    with metrics.timer("export.shards"):
+        while i < len(order):
+            prefix = lookups[order[i]][:prefix_len]
+            entries = {}
+            while i < len(order) and lookups[order[i]].startswith(prefix):
+                code = order[i]
+                rows = rows_by_code[offsets[code]:offsets[code + 1]]
+                payload = [{name: columns[name][r] for name in names} for r in rows]
+                plaintext = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                entries[lookups[code][prefix_len:prefix_len + ENTRY_LEN]] = seal(_record_key(salt, unique_ids[code]), plaintext)
+                records += len(rows)
+                i += 1
+            data = json.dumps(entries, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            path = os.path.join(shards_dir, prefix + ".json")
+            if old_manifest.get(prefix) != digest or not os.path.exists(path):
+                _write_atomic(path, data)
+                written += 1
+            manifest[prefix] = digest
+
+    removed = 0
+    for prefix in set(old_manifest) - set(manifest):
+        try:
+            os.remove(os.path.join(shards_dir, prefix + ".json"))
+            removed += 1
+        except OSError:
+            pass
+
+    version = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:12]
+    config = {"salt": salt, "prefix_len": prefix_len, "entry_len": ENTRY_LEN, "version": version}
+    _write_atomic(os.path.join(out_dir, "manifest.json"), json.dumps({"shards": manifest}, sort_keys=True).encode())
+    _write_atomic(os.path.join(out_dir, "config.json"), json.dumps(config).encode())
+    _write_atomic(os.path.join(out_dir, "index.html"), INDEX_HTML.encode("utf-8"))
+
+    report = {
+        "out_dir": out_dir,
+        "ids": len(unique_ids),
+        "records": records,
+        "shards": len(manifest),
+        "shards_written": written,
+        "shards_removed": removed,
+        "version": version,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info("تصدير ثابت: %s", report)
+    return report
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="ar" dir="rtl">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>ديوان عائلة الأسطل - الاستعلام</title>
+<style>
+  body { font-family: 'Cairo', Tahoma, sans-serif; background: #f9f9f9; margin: 0; color: #222; }
+  header { background: #004d00; color: white; padding: 20px; text-align: center; border-bottom: 4px solid #c5a059; }
+  main { max-width: 640px; margin: 30px auto; padding: 0 15px; }
+  form { display: flex; gap: 10px; }
+  input { flex: 1; padding: 12px; font-size: 1.1rem; border: 2px solid #004d00; border-radius: 10px; }
+  button { padding: 12px 20px; background: #004d00; color: white; border: 0; border-radius: 10px; font-size: 1rem; cursor: pointer; }
+  .card { background: white; border: 2px solid #004d00; border-top: 8px solid #c5a059; border-radius: 15px; padding: 20px; margin-top: 20px; }
+  .card dl { display: grid; grid-template-columns: 1fr 2fr; gap: 10px; margin: 0; }
+  .card dt { font-weight: bold; color: #666; }
+  .msg { margin-top: 20px; padding: 12px; border-radius: 10px; background: #fff3cd; }
+</style>
+</head>
+<body>
+<header><h2 style="margin:0;">ديوان عائلة الأسطل</h2><div>خدمة الاستعلام عن بيانات الأفراد</div></header>
+<main>
+  <form id="search">
+    <input id="id" inputmode="numeric" maxlength="14" placeholder="أدخل رقم الهوية (9 خانات)" autocomplete="off">
+    <button type="submit">بحث</button>
+  </form>
+  <div id="result"></div>
+</main>
+<script>
+const FIELDS = [["name", "الاسم الكامل"], ["id", "رقم الهوية"], ["phone", "رقم الهاتف"], ["branch", "الفرع"],
+                ["marital_status", "الحالة الاجتماعية"], ["wife_name", "الزوجة"]];
+const enc = new TextEncoder();
+const hex = (bytes) => Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("");
+const sha256 = async (text) => new Uint8Array(await crypto.subtle.digest("SHA-256", enc.encode(text)));
+let configPromise = null;
+
+async function hmacBlocks(key, nonce, length) {
+  const out = new Uint8Array(Math.ceil(length / 32) * 32);
+  for (let i = 0; i * 32 < length; i++) {
+    const msg = new Uint8Array(nonce.length + 4);
+    msg.set(nonce);
+    new DataView(msg.buffer).setUint32(nonce.length, i);
+    out.set(new Uint8Array(await crypto.subtle.sign("HMAC", key, msg)), i * 32);
+  }
+  return out.subarray(0, length);
+}
+
+async function unseal(keyBytes, sealed) {
+  const data = Uint8Array.from(atob(sealed), (c) => c.charCodeAt(0));
+  const nonce = data.subarray(0, 12), cipher = data.subarray(12);
+  const key = await crypto.subtle.importKey("raw", keyBytes, { name: "HMAC", hash: "SHA-256" }, false, ["sign"]);
+  const stream = await hmacBlocks(key, nonce, cipher.length);
+  const plain = cipher.map((b, i) => b ^ stream[i]);
+  const tag = new Uint8Array(await crypto.subtle.sign("HMAC", key, plain)).subarray(0, 12);
+  if (hex(tag) !== hex(nonce)) return null;
+  return JSON.parse(new TextDecoder().decode(plain));
+}
+
+async function lookup(id) {
+  configPromise = configPromise || fetch("config.json", { cache: "no-cache" }).then((r) => r.json());
+  const config = await configPromise;
+  const hash = hex(await sha256(config.salt + ":" + id));
+  const prefix = hash.slice(0, config.prefix_len);
+  const resp = await fetch("shards/" + prefix + ".json?v=" + config.version);
+  if (resp.status === 404) return [];
+  const shard = await resp.json();
+  const sealed = shard[hash.slice(config.prefix_len, config.prefix_len + config.entry_len)];
+  if (!sealed) return [];
+  return (await unseal(await sha256("key:" + config.salt + ":" + id), sealed)) || [];
+}
+
+function show(html) { document.getElementById("result").innerHTML = html; }
+function esc(v) { return v == null ? "-" : String(v).replace(/[&<>"]/g, (c) => "&#" + c.charCodeAt(0) + ";"); }
+
+document.getElementById("search").addEventListener("submit", async (e) => {
+  e.preventDefault();
+  const raw = document.getElementById("id").value.trim();
+  const digits = raw.replace(/\\.0$/, "").replace(/[^0-9]/g, "");
+  if (!/^[0-9\\s.-]+$/.test(raw) || digits.length < 8 || digits.length > 9) {
+    show('<div class="msg">⚠️ يرجى إدخال رقم هوية صحيح مكون من 9 أرقام.</div>');
+    return;
+  }
+  const id = digits.padStart(9, "0");
+  show('<div class="msg">جاري البحث...</div>');
+  try {
+    const records = await lookup(id);
+    if (!records.length) { show('<div class="msg">❌ لم يتم العثور على سجل برقم الهوية: ' + esc(id) + "</div>"); return; }
+    const warn = records.length > 1 ? '<div class="msg">⚠️ يوجد ' + records.length + " سجلات مسجلة بنفس الرقم، يرجى مراجعة مجلس العائلة لتصحيح البيانات.</div>" : "";
+    show(warn + records.map((r) => '<div class="card"><h3 style="color:#004d00;text-align:center;">بطاقة تعريف فردية</h3><dl>' +
+      FIELDS.map(([k, label]) => "<dt>" + label + ":</dt><dd>" + esc(r[k]) + "</dd>").join("") + "</dl></div>").join(""));
+  } catch (err) {
+    show('<div class="msg">⚠️ تعذر الاستعلام حالياً، يرجى المحاولة لاحقاً.</div>');
+  }
+});
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,154 @@
+"""قراءة ملفات CSV المصدَّرة: كشف الترميز والفاصل من بداية الملف ثم قراءة سريعة مع تقرير بالأسطر المتجاهلة."""
+import codecs
+import csv
+import io
+import logging
+import re
+import warnings
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# الترميزات المحتملة لملفات Excel العربية بالترتيب
+ENCODINGS = ['utf-8-sig', 'utf-8', 'windows-1256', 'iso-8859-6']
+DELIMITERS = ',;\t|'
+SNIFF_BYTES = 64 * 1024
+BLOCK_SIZE = 4 * 1024 * 1024
+# نحتفظ بتفاصيل أول الأسطر المتجاهلة فقط (العدد الكلي يُحسب دائماً)
+MAX_REPORTED_LINES = 100
+
+_SKIP_WARNING = re.compile(r"Skipping line (\d+): (.+)")
+
+
+class _EncodingMismatch(Exception):
+    """الترميز المختار لا يطابق بايتات لاحقة في الملف"""
+
+
+def sniff_encoding(prefix):
+    """أول ترميز يفك بداية الملف بدون أخطاء (مع السماح بحرف مقطوع في نهاية العينة)"""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    for enc in ENCODINGS[1:]:
+        try:
+            codecs.getincrementaldecoder(enc)().decode(prefix, final=False)
+            return enc
+        except UnicodeDecodeError:
+            continue
+    return ENCODINGS[-1]
+
+
+def sniff_delimiter(sample):
+    """الفاصل الأرجح بين الأعمدة من أول أسطر الملف"""
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+
+
+def sniff_csv(file_path):
+    """كشف (الترميز، الفاصل، أسماء الأعمدة) من أول SNIFF_BYTES بايت فقط"""
+    with open(file_path, 'rb') as f:
+        prefix = f.read(SNIFF_BYTES)
+    encoding = sniff_encoding(prefix)
+    sample = codecs.getincrementaldecoder(encoding)(errors='replace').decode(prefix, final=False)
+    # نتجاهل آخر سطر في العينة لأنه قد يكون مقطوعاً
+    lines = sample.splitlines()
+    if len(lines) > 1 and not sample.endswith(('\n', '\r')):
+        lines = lines[:-1]
+    delimiter = sniff_delimiter('\n'.join(lines[:50]))
+    # الترويسة من العينة كاملة: اسم عمود بين علامتي تنصيص قد يحتوي سطراً جديداً (كما في Excel)
+    header = next(csv.reader(io.StringIO(sample), delimiter=delimiter), [])
+    return encoding, delimiter, header
+
+
+def _read_arrow(file_path, encoding, delimiter, header, skipped):
+    """قراءة متدفقة بالكتل عبر pyarrow مع تسجيل كل سطر غير صالح"""
+    def on_invalid(row):
+        skipped.append((row.number, f"expected {row.expected_columns} fields, saw {row.actual_columns}"))
+        return 'skip'
+
+    reader = pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(encoding=encoding, block_size=BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter, invalid_row_handler=on_invalid),
+        # كل الأعمدة نصوص: لا تضيع الأصفار البادئة في الهاتف ولا تتحول الهوية لأرقام عشرية
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=True,
+        ),
+    )
+    return reader.read_all().to_pandas()
+
+
+def _read_pandas(file_path, encoding, delimiter, skipped):
+    """قراءة بمحرك C في pandas (بدون chunksize: المحرك يخطئ في الأسطر المعيبة عند حدود الكتل)"""
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', pd.errors.ParserWarning)
+            df = pd.read_csv(
+                file_path, encoding=encoding, sep=delimiter, engine='c', header=0,
+                dtype=str, on_bad_lines='warn',
+            )
+    except pd.errors.ParserError:
+        # اقتباس غير مغلق وما شابه: المحرك البطيء يتجاوز هذه الأسطر بدل إيقاف القراءة
+        del skipped[:]
+        df = pd.read_csv(
+            file_path, encoding=encoding, sep=delimiter, engine='python', header=0,
+            dtype=str, on_bad_lines=lambda fields: skipped.append((None, f"malformed line: {fields[:3]}")),
+        )
+        return df, "pandas-python"
+    for w in caught:
+        for match in _SKIP_WARNING.finditer(str(w.message)):
+            skipped.append((int(match.group(1)), match.group(2).strip()))
+    return df, "pandas-c"
+
+
+def read_csv(file_path):
+    """قراءة ملف CSV. يعيد (الجدول، تقرير القراءة)"""
+    encoding, delimiter, header = sniff_csv(file_path)
+    # بدون BOM لا فرق بين utf-8 و utf-8-sig
+    candidates = [encoding] + [enc for enc in ENCODINGS if enc not in (encoding, 'utf-8-sig')]
+    report = {"format": "csv", "delimiter": delimiter, "encoding_fallbacks": []}
+
+    use_arrow = HAS_ARROW and bool(header) and len(set(header)) == len(header)
+    for enc in candidates:
+        skipped = []
+        try:
+            if use_arrow:
+                try:
+                    df = _read_arrow(file_path, enc, delimiter, header, skipped)
+                    report["engine"] = "pyarrow"
+                except pa.ArrowInvalid as e:
+                    if "UTF8" in str(e):
+                        raise _EncodingMismatch(str(e))
+                    # ملف لا يناسب قارئ Arrow (مثل أسطر اقتباس غير مغلقة): نكمل بمحرك pandas
+                    logger.warning("قارئ Arrow فشل في %s (%s)، الانتقال لمحرك pandas", file_path, e)
+                    use_arrow = False
+                    skipped = []
+            if not use_arrow:
+                df, report["engine"] = _read_pandas(file_path, enc, delimiter, skipped)
+        except (UnicodeDecodeError, _EncodingMismatch) as e:
+            # العينة كانت صالحة لكن بايتات لاحقة في الملف ليست كذلك
+            report["encoding_fallbacks"].append({"encoding": enc, "reason": str(e)})
+            logger.warning("تعذرت قراءة %s بترميز %s: %s", file_path, enc, e)
+            continue
+        report.update(
+            encoding=enc,
+            rows=len(df),
+            skipped=len(skipped),
+            skipped_lines=[{"line": line, "reason": reason} for line, reason in skipped[:MAX_REPORTED_LINES]],
+        )
+        if skipped:
+            logger.warning("تم تجاهل %d سطراً غير صالح في %s (أولها السطر %s: %s)",
+                           len(skipped), file_path, skipped[0][0], skipped[0][1])
+        return df, report
+
+    return None, report
@@ -0,0 +1,237 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .compact import compact_frame
+from .dataset import FamilyDataset
+from .ingest import read_csv
+from .lookup import ID_COL, normalize_id
+from .snapshot import load_indexes, load_snapshot, save_indexes, save_snapshot
+
+logger = logging.getLogger(__name__)
+
+# قائمة بأسماء الملفات المحتملة (للتعامل مع أي ملف قمت برفعه)
+POSSIBLE_FILES = [
+    "data.xlsx", "data.csv",
+    "عائلة الاسطل20.11.2025.xlsx - ورقة1.csv",
+    "alastal family.xlsx - ورقة1.csv"
+]
+
+# مجلد تُوضع فيه ملفات التصدير المؤرخة (كل ملفات CSV/XLSX فيه مصادر إضافية)
+SOURCES_DIR = os.environ.get("ALASTAL_DATA_DIR", "exports")
+SOURCE_EXTENSIONS = (".csv", ".xlsx")
+
+# خريطة لتوحيد أسماء الأعمدة المختلفة
+COL_MAP = {
+    "رقم الهوية": ["رقم الهوية", "الهوية"],
+    "الاسم": ["الاسم", "الاسم الرباعي"],
+    "رقم الهاتف": ["رقم الهاتف", "رقم الموبايل", "الجوال"],
+    "الحالة الاجتماعية": ["الحالة الاجتماعية"],
+    "عدد الافراد": ["عدد افراد الاسرة", "عدد الافراد"],
+    "هوية الزوجة": ["هوية الزوجة", "رقم هوية الزوجة"],
+    "اسم الزوجة": ["اسم الزوجة"]
+}
+
+
+def find_data_file():
+    """أول ملف بيانات موجود من قائمة الملفات المحتملة"""
+    for name in POSSIBLE_FILES:
+        if os.path.exists(name):
+            return name
+    return ""
+
+
+def find_data_files():
+    """كل مصادر البيانات الموجودة (الملفات المعروفة + مجلد التصدير) من الأقدم تعديلاً إلى الأحدث.
+
+    الترتيب هو ترتيب الأولوية عند الدمج: الأحدث يغلب لكل رقم هوية.
+    """
+    paths = [name for name in POSSIBLE_FILES if os.path.isfile(name)]
+    if os.path.isdir(SOURCES_DIR):
+        paths += [
+            os.path.join(SOURCES_DIR, name) for name in os.listdir(SOURCES_DIR)
+            if name.lower().endswith(SOURCE_EXTENSIONS) and not name.startswith((".", "~$"))
+        ]
+    versions = [(current_version(p), p) for p in paths]
+    versions = [(v, p) for v, p in versions if v is not None]
+    return [p for _, p in sorted(versions, key=lambda vp: (vp[0][2], vp[1]))]
+
+
+def sources_version(paths):
+    """بصمة نسخة البيانات لعدة مصادر: tuple من بصمات الملفات، أو None إذا لم يوجد أي ملف"""
+    versions = tuple(v for v in (current_version(p) for p in paths) if v is not None)
+    return versions or None
+
+
+def current_version(file_path=None):
+    """بصمة نسخة البيانات: (المسار، الحجم، وقت التعديل) أو None إذا لم يوجد ملف"""
+    file_path = file_path or find_data_file()
+    if not file_path:
+        return None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (file_path, stat.st_size, stat.st_mtime_ns)
+
+
+def read_source(file_path):
+    """قراءة ملف البيانات الخام (Excel أو CSV). يعيد (الجدول، تقرير القراءة)"""
+    if file_path.endswith('.xlsx'):
+        df = pd.read_excel(file_path, engine='openpyxl', header=0)
+        return df, {"format": "xlsx", "rows": len(df), "skipped": 0}
+    return read_csv(file_path)
+
+
+def normalize_columns(df):
+    """تنظيف وتوحيد أسماء الأعمدة وعمود الهوية"""
+    df.columns = df.columns.astype(str).str.replace('\n', ' ').str.strip()
+
+    final_cols = {}
+    for key, candidates in COL_MAP.items():
+        for cand in candidates:
+            if cand in df.columns:
+                final_cols[cand] = key
+                break
+
+    df = df.rename(columns=final_cols)
+    # التأكد من وجود عمود الهوية وتنظيفه
+    if ID_COL in df.columns:
+        with metrics.timer("loader.id_cleanup"):
+            df[ID_COL] = normalize_id(df[ID_COL].to_numpy()).to_numpy()
+    return df
+
+
+def load_source(file_path, use_snapshot=True, cache_dir=None):
+    """تحميل مصدر واحد جاهزاً للبحث (موحد الأعمدة ومضغوط). يعيد (الجدول، تقرير القراءة)
+
+    يُقرأ الجدول من اللقطة الثنائية إن كانت مطابقة للملف المصدر، وإلا يُحلَّل الملف وتُكتب لقطة جديدة.
+    """
+    df, report = None, None
+    if use_snapshot:
+        with metrics.timer("loader.snapshot"):
+            df, report = load_snapshot(file_path, cache_dir)
+        metrics.incr("snapshot.hit" if df is not None else "snapshot.miss")
+    if df is None:
+        with metrics.timer("loader.parse"):
+            df, report = read_source(file_path)
+        if df is None: return None, None
+        with metrics.timer("loader.normalize"):
+            df = normalize_columns(df)
+        with metrics.timer("loader.compact"):
+            df, memory = compact_frame(df)
+        report = {**report, "memory": memory}
+        if use_snapshot:
+            with metrics.timer("loader.snapshot_write"):
+                save_snapshot(file_path, df, report, cache_dir)
+    return df, report
+
+
+def _load_timed(file_path, use_snapshot, cache_dir=None):
+    start = time.perf_counter()
+    try:
+        df, report = load_source(file_path, use_snapshot, cache_dir)
+    except Exception:
+        logger.exception("تعذر تحميل %s", file_path)
+        df, report = None, None
+    return df, report, time.perf_counter() - start
+
+
+def merge_sources(frames):
+    """دمج جداول عدة مصادر (بترتيب الأولوية من الأقدم للأحدث) مع إزالة التكرار حسب رقم الهوية.
+
+    لكل رقم هوية تُؤخذ صفوف أحدث مصدر يحتويه فقط (تبقى تكرارات المصدر نفسه ظاهرة كما هي)،
+    والصفوف بدون هوية تُحذف مكرراتها المتطابقة تماماً. يعيد (الجدول، عدد الصفوف المأخوذة من كل مصدر)
+    """
+    if len(frames) == 1:
+        return frames[0], [len(frames[0])]
+    rank = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+    df = pd.concat(frames, ignore_index=True)
+    if ID_COL in df.columns:
+        ids = normalize_id(df[ID_COL]).to_numpy(dtype=object)
+        has_id = ids != ""
+        # أحدث مصدر لكل رقم هوية
+        newest = pd.Series(rank[has_id]).groupby(ids[has_id]).transform("max").to_numpy()
+        keep = ~has_id
+        keep[has_id] = rank[has_id] == newest
+        keep[~has_id] = ~df[~has_id].astype(str).duplicated(keep="last").to_numpy()
+    else:
+        keep = ~df.astype(str).duplicated(keep="last").to_numpy()
+    df = df[keep].reset_index(drop=True)
+    # فئات المصادر المختلفة وأنواع الهوية تختلط عند الدمج: ضغط الناتج من جديد
+    df, _ = compact_frame(df)
+    return df, np.bincount(rank[keep], minlength=len(frames)).tolist()
+
+
+def load_sources(paths, use_snapshot=True, max_workers=None, cache_dir=None):
+    """تحميل عدة مصادر بالتوازي ثم دمجها. يعيد (الجدول، التقرير) أو (None, None)
+
+    التقرير يحتوي عدد الصفوف والزمن لكل مصدر. الخيوط تكفي هنا: قراءة CSV عبر pyarrow وكتابة اللقطات
+    تحرر قفل بايثون، وتتجنب نسخ الجداول بين العمليات داخل خادم Streamlit.
+    """
+    started = time.perf_counter()
+    if len(paths) == 1:
+        results = [_load_timed(paths[0], use_snapshot, cache_dir)]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(paths), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(_load_timed, paths, [use_snapshot] * len(paths), [cache_dir] * len(paths)))
+
+    loaded = [(path, df, report, seconds) for path, (df, report, seconds) in zip(paths, results) if df is not None]
+    if not loaded:
+        return None, None
+    with metrics.timer("loader.merge"):
+        df, kept = merge_sources([df for _, df, _, _ in loaded])
+    sources = [
+        {"path": path, "rows": len(frame), "kept": k, "seconds": round(seconds, 3), "format": (report or {}).get("format")}
+        for (path, frame, report, seconds), k in zip(loaded, kept)
+    ]
+    sources += [{"path": path, "error": True} for path, (df, _, _) in zip(paths, results) if df is None]
+    if len(loaded) == 1:
+        report = {**(loaded[0][2] or {}), "sources": sources}
+    else:
+        report = {
+            "format": "merged",
+            "rows": len(df),
+            "skipped": sum((r or {}).get("skipped", 0) for _, _, r, _ in loaded),
+            "duplicates_dropped": sum(len(f) for _, f, _, _ in loaded) - len(df),
+            "seconds": round(time.perf_counter() - started, 3),
+            "sources": sources,
+        }
+    return df, report
+
+
+def load_data(file_path=None, use_snapshot=True, cache_dir=None):
+    """تحميل بيانات العائلة للبحث وبناء فهارسها. يعيد FamilyDataset أو None
+
+    file_path: ملف أو قائمة ملفات؛ افتراضياً كل المصادر الموجودة (find_data_files) مدمجة.
+    مع مصدر واحد تُقرأ الفهارس من بجانب لقطته إن وُجدت، وإلا تُبنى ثم تُحفظ هناك.
+    فهارس المصادر المدمجة تُبنى دائماً لأن الجدول المدمج ليست له لقطة.
+    """
+    with metrics.timer("loader.probe"):
+        paths = [file_path] if isinstance(file_path, str) else list(file_path or find_data_files())
+        version = sources_version(paths)
+    if not version: return None
+
+    try:
+        df, report = load_sources(paths, use_snapshot, cache_dir=cache_dir)
+        if df is None: return None
+        indexes = None
+        cached = use_snapshot and len(paths) == 1
+        if cached:
+            with metrics.timer("loader.index_snapshot"):
+                indexes = load_indexes(paths[0], len(df), cache_dir)
+            metrics.incr("snapshot_indexes.hit" if indexes is not None else "snapshot_indexes.miss")
+        with metrics.timer("loader.index_build"):
+            dataset = FamilyDataset(df, version=version, source=", ".join(paths), load_report=report, **(indexes or {}))
+        if cached and indexes is None:
+            with metrics.timer("loader.snapshot_write"):
+                save_indexes(paths[0], dataset.indexes(), len(df), cache_dir)
+        return dataset
+    except Exception:
+        metrics.incr("loader.error")
+        return None
\ No newline at end of file
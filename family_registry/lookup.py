@@ -0,0 +1,231 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+ID_COL = "رقم الهوية"
+WIFE_ID_COL = "هوية الزوجة"
+PHONE_COL = "رقم الهاتف"
+
+# عدد خانات رقم الهوية المقبول: 9، أو 8 إذا حذف Excel الصفر البادئ
+ID_LENGTHS = (8, 9)
+
+
+# ==============================================================================
+# توحيد المفاتيح (هوية / هاتف)
+# ==============================================================================
+
+def _as_text(values):
+    """القيم كنصوص (الفارغ -> ""). نصوص Arrow تبقى كما هي فتعمل عليها عمليات النص السريعة"""
+    s = pd.Series(values)
+    if not isinstance(s.dtype, pd.StringDtype):
+        s = s.astype(object)
+    return s.fillna("").astype(str)
+
+
+def id_digits(values):
+    """خانات رقم الهوية كما أُدخلت (بدون .0 والمسافات والرموز) وقبل إكمال الأصفار البادئة"""
+    s = _as_text(values)
+    return s.str.replace(r"\.0$", "", regex=True).str.replace(r"\D", "", regex=True)
+
+
+def id_has_symbols(values):
+    """هل في رقم الهوية حروف أو رموز غير الخانات والمسافات والشرطات (40A123456)؟ مصفوفة bool لكل صف"""
+    s = _as_text(values).str.replace(r"\.0$", "", regex=True)
+    return s.str.contains(r"[^\d\s\-]", regex=True).to_numpy(dtype=bool)
+
+
+def normalize_id(values):
+    """توحيد أرقام الهوية: إزالة .0 والمسافات والرموز، وإكمال الأصفار البادئة لـ 9 خانات"""
+    if pd.api.types.is_integer_dtype(getattr(values, "dtype", None)):
+        # عمود هوية مضغوط (أعداد): تحويل مباشر للنص بدون المرور بكائنات بايثون
+        s = pd.Series(values)
+        missing = s.isna().to_numpy()
+        return s.astype(str).str.zfill(9).where(~missing, "")
+    s = id_digits(values)
+    return s.where(s == "", s.str.zfill(9))
+
+
+def normalize_phone(values):
+    """توحيد أرقام الهاتف لآخر 9 خانات (8 للهاتف الأرضي) بدون مقدمة الدولة أو الصفر (0599123456 -> 599123456)"""
+    s = _as_text(values)
+    s = s.str.replace(r"\.0$", "", regex=True).str.replace(r"\D", "", regex=True)
+    s = s.str.replace(r"^(00)?(970|972)", "", regex=True).str.lstrip("0")
+    return s.where(s.str.len() >= 8, "").str[-9:]
+
+
+_TRAILING_ZERO = re.compile(r"\.0$")
+_NON_DIGITS = re.compile(r"[^0-9]")
+_COUNTRY_PREFIX = re.compile(r"^(00)?(970|972)")
+
+
+def _digits(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return _NON_DIGITS.sub("", _TRAILING_ZERO.sub("", str(value)))
+
+
+def normalize_id_one(value):
+    """نفس normalize_id لقيمة واحدة (بدون كلفة إنشاء Series لكل استعلام)"""
+    digits = _digits(value)
+    return digits.zfill(9) if digits else ""
+
+
+def normalize_phone_one(value):
+    """نفس normalize_phone لقيمة واحدة"""
+    digits = _COUNTRY_PREFIX.sub("", _digits(value)).lstrip("0")
+    return digits[-9:] if len(digits) >= 8 else ""
+
+
+# أطول مفتاح يُفهرس: "1" + 18 خانة ما زال يتسع في int64
+MAX_KEY_DIGITS = 18
+
+
+def _key_numbers(values, normalizer):
+    """مفاتيح الفهرس كأعداد int64 لكل صف (-1 للفارغ).
+
+    المفتاح = int("1" + الخانات بعد التوحيد): الواحد البادئ يحفظ الأصفار البادئة وطول الرقم.
+    """
+    if normalizer is normalize_id and pd.api.types.is_integer_dtype(getattr(values, "dtype", None)):
+        # عمود هوية مضغوط (9 خانات أو أقل): int("1" + zfill(9)) = 10^9 + الرقم
+        numbers = pd.Series(values).to_numpy(dtype=np.int64, na_value=-1)
+        return np.where(numbers >= 0, numbers + 10 ** 9, -1)
+    digits = normalizer(values)
+    lengths = digits.str.len().to_numpy()
+    keys = np.full(len(digits), -1, dtype=np.int64)
+    valid = (lengths > 0) & (lengths <= MAX_KEY_DIGITS)
+    if valid.any():
+        keys[valid] = ("1" + digits[valid]).astype(np.int64).to_numpy()
+    return keys
+
+
+def _key_one(digits):
+    return int("1" + digits) if 0 < len(digits) <= MAX_KEY_DIGITS else -1
+
+
+class _KeyTable:
+    """جدول مفاتيح حقل واحد بصيغة CSR: مفاتيح فريدة مرتبة، وبداية مواقع كل مفتاح، ومواقع الصفوف"""
+
+    def __init__(self, keys, offsets, positions):
+        self.keys = keys
+        self.offsets = offsets
+        self.positions = positions
+
+    @classmethod
+    def from_row_keys(cls, row_keys):
+        present = np.flatnonzero(row_keys >= 0)
+        # ترتيب مستقر: مواقع المفتاح الواحد تبقى تصاعدية
+        order = present[np.argsort(row_keys[present], kind="stable")]
+        keys, starts = np.unique(row_keys[order], return_index=True)
+        offsets = np.append(starts, len(order)).astype(np.int64)
+        return cls(keys, offsets, order.astype(np.int32))
+
+    def row_keys(self, n):
+        """عكس البناء: مفتاح كل صف (-1 للصفوف بدون مفتاح)"""
+        row_keys = np.full(n, -1, dtype=np.int64)
+        row_keys[self.positions] = np.repeat(self.keys, np.diff(self.offsets))
+        return row_keys
+
+    def get(self, key):
+        i = int(np.searchsorted(self.keys, key))
+        if i == len(self.keys) or self.keys[i] != key:
+            return ()
+        return tuple(self.positions[self.offsets[i]:self.offsets[i + 1]].tolist())
+
+    def memory_usage(self):
+        return int(self.keys.nbytes + self.offsets.nbytes + self.positions.nbytes)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+# ==============================================================================
+# فهرس البحث
+# ==============================================================================
+
+class LookupIndex:
+    """فهرس يربط الهوية وهوية الزوجة والهاتف بمواقع الصفوف.
+
+    لكل حقل مصفوفات NumPy (مفاتيح int64 مرتبة + مواقع بصيغة CSR) بدل قواميس بايثون، والبحث بـ
+    np.searchsorted: نحو 20 بايت لكل صف لكل حقل بدل مئات البايتات للمفتاح النصي والـ tuple.
+    """
+
+    # ترتيب البحث عند إدخال رقم واحد من المستخدم
+    FIELDS = (ID_COL, WIFE_ID_COL, PHONE_COL)
+    NORMALIZERS = {ID_COL: normalize_id, WIFE_ID_COL: normalize_id, PHONE_COL: normalize_phone}
+    SCALAR_NORMALIZERS = {ID_COL: normalize_id_one, WIFE_ID_COL: normalize_id_one, PHONE_COL: normalize_phone_one}
+
+    def __init__(self, tables, rows):
+        self.tables = tables
+        self.rows = rows
+
+    @classmethod
+    def from_frame(cls, df):
+        """بناء الفهرس من جدول البيانات بعد توحيد الأعمدة"""
+        empty = np.full(len(df), -1, dtype=np.int64)
+        return cls({
+            field: _KeyTable.from_row_keys(
+                _key_numbers(df[field], normalizer) if field in df.columns else empty
+            )
+            for field, normalizer in cls.NORMALIZERS.items()
+        }, len(df))
+
+    def copy(self):
+        """نسخة مستقلة (المصفوفات لا تُعدَّل بعد البناء، فالنسخة تشاركها حتى يستبدلها patch)"""
+        return LookupIndex(dict(self.tables), self.rows)
+
+    def patch(self, old_df, removed, new_df, added):
+        """تحديث تزايدي: حذف مفاتيح الصفوف removed من old_df ثم إضافة مفاتيح الصفوف added من new_df.
+
+        removed و added مواقع صفوف (نقل صف من موقع لآخر = حذف من القديم وإضافة في الجديد).
+        لا يُعاد توحيد إلا قيم الصفوف added؛ مفاتيح باقي الصفوف تُستعاد من المصفوفات الحالية ثم يُعاد ترتيبها.
+        """
+        n = len(new_df)
+        for field, normalizer in self.NORMALIZERS.items():
+            row_keys = self.tables[field].row_keys(max(self.rows, n))
+            row_keys[removed] = -1
+            if field in new_df.columns and len(added):
+                row_keys[added] = _key_numbers(new_df[field].iloc[added], normalizer)
+            self.tables[field] = _KeyTable.from_row_keys(row_keys[:n])
+        self.rows = n
+
+    def get(self, field, value):
+        """مواقع الصفوف المطابقة لقيمة في حقل معين (بعد التوحيد)"""
+        key = _key_one(self.SCALAR_NORMALIZERS[field](value))
+        if key < 0:
+            return ()
+        return self.tables[field].get(key)
+
+    def search(self, query):
+        """البحث برقم واحد: الهوية ثم هوية الزوجة ثم الهاتف. يعيد (الحقل، المواقع)"""
+        for field in self.FIELDS:
+            positions = self.get(field, query)
+            if positions:
+                return field, positions
+        return None, ()
+
+    def resolve(self, query):
+        """مثل search مع مفتاح موحد للنتيجة: (الحقل، المفتاح، المواقع).
+
+        صيغ الرقم المختلفة (0599123456، +970599123456، 970599123456) تعطي نفس (الحقل، المفتاح)؛
+        وغير الموجود مفتاحه الهاتف الموحد إن أمكن وإلا الهوية الموحدة.
+        """
+        for field in self.FIELDS:
+            key = self.SCALAR_NORMALIZERS[field](query)
+            positions = self.tables[field].get(_key_one(key)) if key else ()
+            if positions:
+                return field, key, positions
+        return None, normalize_phone_one(query) or normalize_id_one(query), ()
+
+    def memory_usage(self):
+        """حجم الفهرس بالبايت (مصفوفات المفاتيح والمواقع لكل الحقول)"""
+        return sum(table.memory_usage() for table in self.tables.values())
+
+    def duplicate_ids(self):
+        """أرقام الهوية المكررة في السجل مع عدد تكرارها"""
+        table = self.tables[ID_COL]
+        counts = np.diff(table.offsets)
+        return {str(key)[1:]: int(c) for key, c in zip(table.keys[counts > 1].tolist(), counts[counts > 1].tolist())}
+
+    def __len__(self):
+        return len(self.tables[ID_COL])
@@ -0,0 +1,125 @@
+"""قياسات أداء خفيفة داخل العملية: عدادات ومدرجات تكرارية (histograms) للأزمنة.
+
+المدرج يحفظ عدد القياسات في فئات لوغاريتمية ثابتة (كل فئة أكبر بـ 20% من سابقتها) بدل حفظ كل قياس،
+فتكلفة التسجيل ثابتة والذاكرة محدودة مهما طال تشغيل الخادم. المئينات تقريبية بدقة عرض الفئة.
+
+    with metrics.timer("loader.parse"):
+        df = read_source(path)
+    metrics.incr("snapshot.hit")
+    metrics.snapshot()   # -> قاموس قابل للتحويل إلى JSON
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# حدود الفئات بالثواني: من 1 ميكروثانية إلى ~1000 ثانية
+_GROWTH = 1.2
+BUCKET_BOUNDS = [1e-6 * _GROWTH ** i for i in range(int(math.log(1e9) / math.log(_GROWTH)) + 1)]
+
+
+class Histogram:
+    """توزيع أزمنة بفئات لوغاريتمية ثابتة"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        seconds = float(seconds)
+        i = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def percentile(self, q):
+        """المئين q (0-100) بالثواني: الحد الأعلى للفئة التي يقع فيها"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        """ملخص بالمللي ثانية"""
+        ms = lambda s: round(s * 1000, 3)
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.total / self.count) if self.count else 0.0,
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max),
+        }
+
+
+class Metrics:
+    """مجموعة العدادات والمدرجات للعملية كلها (مشتركة بين الجلسات والخيوط)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(name, Histogram())
+        return hist
+
+    def observe(self, name, seconds):
+        self.histogram(name).observe(seconds)
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """كل القياسات الحالية كقاموس (للعرض أو التصدير JSON)"""
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "counters": dict(sorted(self.counters.items())),
+            "timings": {name: h.summary() for name, h in sorted(self.histograms.items())},
+        }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+
+# النسخة المشتركة للعملية، ودوال مختصرة عليها
+METRICS = Metrics()
+observe = METRICS.observe
+incr = METRICS.incr
+timer = METRICS.timer
+snapshot = METRICS.snapshot
+
+
+def hit_ratio(counters, prefix):
+    """نسبة الإصابة لذاكرة مؤقتة من عدادي prefix.hit و prefix.miss"""
+    hits, misses = counters.get(f"{prefix}.hit", 0), counters.get(f"{prefix}.miss", 0)
+    return hits / (hits + misses) if hits + misses else None
@@ -0,0 +1,152 @@
+"""البحث التقريبي بالأسماء العربية عبر فهرس مقلوب لثلاثيات الحروف (character trigrams)."""
+import re
+
+import numpy as np
+import pandas as pd
+
+NAME_COL = "الاسم"
+
+# توحيد الحروف: الألف بأشكالها، التاء المربوطة/الهاء، الألف المقصورة/الياء
+_LETTER_RULES = (
+    ("[\u0622\u0623\u0625\u0671]", "\u0627"),
+    ("\u0629", "\u0647"),
+    ("\u0649", "\u064A"),
+)
+# التشكيل (الحركات والتنوين والشدة والسكون والألف الخنجرية) والتطويل
+_DIACRITICS = "[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]"
+# كل ما ليس حرفاً يصبح فراغاً (صيغ متوافقة مع re ومع محرك Arrow)
+_NON_LETTERS = "[^a-zA-Z\u0621-\u064A ]"
+_SPACES = " +"
+
+
+def normalize_arabic(text):
+    """توحيد نص عربي واحد للبحث"""
+    if not isinstance(text, str):
+        return ""
+    text = re.sub(_DIACRITICS, "", text)
+    for pattern, repl in _LETTER_RULES:
+        text = re.sub(pattern, repl, text)
+    text = re.sub(_NON_LETTERS, " ", text)
+    return re.sub(_SPACES, " ", text).strip()
+
+
+def normalize_arabic_series(values):
+    """توحيد عمود أسماء كامل. القيم الفريدة فقط تُوحَّد، وبأنماط نصية حتى تُنفَّذ في Arrow عند توفره"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object).fillna("").astype(str))
+    s = pd.Series(uniques, dtype="str")
+    s = s.str.replace(_DIACRITICS, "", regex=True)
+    for pattern, repl in _LETTER_RULES:
+        s = s.str.replace(pattern, repl, regex=True)
+    s = s.str.replace(_NON_LETTERS, " ", regex=True)
+    s = s.str.replace(_SPACES, " ", regex=True).str.strip()
+    return pd.Series(s.to_numpy(dtype=object)[codes], dtype=object)
+
+
+def _gram_codes(names):
+    """كل ثلاثيات الحروف داخل الكلمات (مع حدود الكلمة) كأرقام int64 مع رقم الاسم لكل منها.
+
+    تُدمج الأسماء في نص واحد بترميز UTF-32 وتُستخرج النوافذ الثلاثية بعمليات NumPy،
+    فلا توجد حلقة بايثون على الحروف.
+    """
+    joined = "\0".join(f" {name} " for name in names)
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    name_of_char = np.cumsum(codes == 0)
+    c0, c1, c2 = codes[:-2], codes[1:-1], codes[2:]
+    # نستبعد النوافذ العابرة بين اسمين أو بين كلمتين (الفراغ في المنتصف)
+    valid = (c0 != 0) & (c1 != 0) & (c2 != 0) & (c1 != 32)
+    grams = (c0[valid] << 42) | (c1[valid] << 21) | c2[valid]
+    return grams, name_of_char[:-2][valid]
+
+
+class NameIndex:
+    """فهرس مقلوب: ثلاثية حروف -> أرقام الأسماء الفريدة التي تحتويها (بصيغة CSR مضغوطة)"""
+
+    # الثلاثيات الشائعة جداً (مثل "اسطل" الموجودة في كل الأسماء) تُتجاهل عند الاستعلام
+    # إذا احتوى الاستعلام ثلاثيات أندر منها، حتى لا يمر كل استعلام على السجل كاملاً
+    COMMON_GRAM_RATIO = 0.05
+
+    def __init__(self, gram_keys, offsets, postings, name_sizes, name_rows, names):
+        self.gram_keys = gram_keys      # الثلاثيات مرتبة (int64)
+        self.offsets = offsets          # بداية قائمة كل ثلاثية داخل postings
+        self.postings = postings        # أرقام الأسماء مرتبة حسب الثلاثية
+        self.name_sizes = name_sizes    # عدد الثلاثيات في كل اسم
+        self.name_rows = name_rows      # (مواقع الصفوف مرتبة حسب الاسم، بداية كل اسم)
+        self.names = names              # الأسماء بعد التوحيد
+
+    @classmethod
+    def from_series(cls, values):
+        """بناء الفهرس من عمود الأسماء (مرة واحدة عند التحميل)"""
+        normalized = normalize_arabic_series(np.asarray(values, dtype=object)).to_numpy()
+        codes, names = pd.factorize(normalized)
+        names = np.asarray(names, dtype=object)
+
+        # مواقع الصفوف لكل اسم فريد (الأسماء المكررة تشير لأكثر من صف)
+        row_order = np.argsort(codes, kind="stable").astype(np.int32)
+        row_offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(names)))))
+
+        grams, name_ids = _gram_codes(names.tolist())
+        # ترقيم الثلاثيات بترتيبها (factorize بالتجزئة ثم ترتيب القيم الفريدة فقط)
+        codes, keys = pd.factorize(grams)
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[np.argsort(keys)] = np.arange(len(keys))
+        codes = rank[codes]
+        # ترتيب مستقر حسب الثلاثية (radix sort عندما يكفي 16 بت) مع بقاء أرقام الأسماء متصاعدة
+        order = np.argsort(codes.astype(np.uint16 if len(keys) <= 0xFFFF else np.int32), kind="stable")
+        codes, name_ids = codes[order], name_ids[order]
+        # إزالة تكرار الثلاثية داخل الاسم نفسه
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = (codes[1:] != codes[:-1]) | (name_ids[1:] != name_ids[:-1])
+        codes, name_ids = codes[first], name_ids[first].astype(np.int32)
+
+        gram_keys = np.sort(keys)
+        offsets = np.searchsorted(codes, np.arange(len(keys) + 1))
+        name_sizes = np.bincount(name_ids, minlength=len(names)).astype(np.int32)
+        return cls(gram_keys, offsets, name_ids, name_sizes, (row_order, row_offsets), names)
+
+    def memory_usage(self):
+        """حجم الفهرس بالبايت (المصفوفات + نصوص الأسماء الفريدة)"""
+        arrays = (self.gram_keys, self.offsets, self.postings, self.name_sizes) + tuple(self.name_rows)
+        return int(sum(a.nbytes for a in arrays) + pd.Series(self.names, dtype=object).memory_usage(deep=True))
+
+    def _query_postings(self, query):
+        grams, _ = _gram_codes([normalize_arabic(query)])
+        grams = np.unique(grams)
+        if not len(grams) or not len(self.gram_keys):
+            return len(grams), []
+        pos = np.searchsorted(self.gram_keys, grams).clip(max=len(self.gram_keys) - 1)
+        pos = pos[self.gram_keys[pos] == grams]
+        lengths = self.offsets[pos + 1] - self.offsets[pos]
+        rare = lengths <= max(1, int(len(self.names) * self.COMMON_GRAM_RATIO))
+        if rare.any():
+            pos = pos[rare]
+        return len(grams), [self.postings[self.offsets[p]:self.offsets[p + 1]] for p in pos]
+
+    def search(self, query, k=10, min_score=0.3):
+        """أفضل k نتائج للاستعلام: قائمة (موقع الصف، درجة التطابق) مرتبة تنازلياً"""
+        query_size, lists = self._query_postings(query)
+        if not lists:
+            return []
+
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        candidates = np.flatnonzero(shared)
+        # تغطية الاستعلام (لمن يكتب جزءاً من الاسم) مع تفضيل الأسماء الأقرب طولاً للاستعلام
+        coverage = shared[candidates] / len(lists)
+        length_ratio = np.minimum(1, query_size / self.name_sizes[candidates])
+        scores = coverage * (0.5 + 0.5 * length_ratio)
+
+        keep = scores >= min_score
+        candidates, scores = candidates[keep], scores[keep]
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        ranked = np.argsort(-scores, kind="stable")
+
+        row_order, row_offsets = self.name_rows
+        results = []
+        for name_id, score in zip(candidates[ranked].tolist(), scores[ranked].tolist()):
+            rows = row_order[row_offsets[name_id]:row_offsets[name_id + 1]]
+            results.extend((int(pos), round(score, 3)) for pos in rows)
+        return results[:k]
+
+    def __len__(self):
+        return len(self.names)
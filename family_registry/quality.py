@@ -0,0 +1,182 @@
+"""فحص جودة بيانات السجل عند التحميل (عمليات NumPy/pandas على الأعمدة كاملة، بدون حلقة على الصفوف).
+
+الفحوص:
+- رقم الهوية: فارغ، ليس 9 خانات (أو 8 بعد حذف Excel للصفر البادئ)، فيه حروف أو رموز،
+  خانة التحقق خاطئة (Luhn كما في الهوية الفلسطينية)، مكرر.
+- هوية الزوجة: خانة تحقق خاطئة، فيها حروف أو رموز، مطابقة لهوية الزوج نفسه، مسجلة لأكثر من زوج.
+- رقم الهاتف: لا يمكن توحيده لرقم جوال (9 خانات تبدأ بـ 5) أو أرضي (8 خانات).
+  التقرير يعرض القيمة كما أُدخلت وبعد التوحيد (الصيغة التي يبحث بها الفهرس).
+- عدد الأفراد: غير رقمي أو خارج النطاق المعقول.
+
+النتيجة تُحفظ مع نسخة البيانات كمصفوفتين (موقع الصف، رمز المشكلة)، وجدول التقرير يُبنى عند الطلب فقط.
+"""
+import numpy as np
+import pandas as pd
+
+from .lookup import (
+    ID_COL, ID_LENGTHS, PHONE_COL, WIFE_ID_COL, id_digits, id_has_symbols, normalize_id, normalize_phone,
+)
+from .names import NAME_COL
+
+COUNT_COL = "عدد الافراد"
+# أقل وأكثر عدد أفراد أسرة مقبول
+HOUSEHOLD_RANGE = (1, 25)
+
+# رمز المشكلة -> (الوصف، العمود الذي تُعرض قيمته في التقرير)
+ISSUES = {
+    1: ("رقم هوية فارغ", ID_COL),
+    2: ("رقم الهوية ليس 9 خانات", ID_COL),
+    3: ("خانة التحقق في رقم الهوية خاطئة", ID_COL),
+    4: ("رقم هوية مكرر", ID_COL),
+    5: ("خانة التحقق في هوية الزوجة خاطئة", WIFE_ID_COL),
+    6: ("هوية الزوجة مطابقة لهوية الفرد", WIFE_ID_COL),
+    7: ("هوية الزوجة مسجلة لأكثر من زوج", WIFE_ID_COL),
+    8: ("رقم هاتف غير صالح", PHONE_COL),
+    9: ("عدد الأفراد خارج النطاق", COUNT_COL),
+    10: ("رقم الهوية يحتوي على حروف أو رموز", ID_COL),
+    11: ("هوية الزوجة تحتوي على حروف أو رموز", WIFE_ID_COL),
+}
+
+ROW_COL = "الموقع في السجل"
+ISSUE_COL = "المشكلة"
+VALUE_COL = "القيمة"
+NORMALIZED_COL = "القيمة بعد التوحيد"
+
+# توحيد قيمة كل عمود للعرض في التقرير
+_NORMALIZERS = {ID_COL: normalize_id, WIFE_ID_COL: normalize_id, PHONE_COL: normalize_phone}
+
+
+def _id_numbers(values):
+    """أرقام الهوية كأعداد int64 (-1 للفارغ أو المعيب) مع عدد خانات كل رقم قبل إكمال الأصفار، وهل فيه حروف أو رموز"""
+    if pd.api.types.is_integer_dtype(getattr(values, "dtype", None)):
+        # عمود مضغوط: لا يُضغط إلا إذا كانت كل الأرقام 8 أو 9 خانات بلا رموز (compact._ids_to_uint)،
+        # فالعدد هو الرقم بعد إكمال الأصفار لـ 9 خانات كما في normalize_id
+        numbers = pd.Series(values).to_numpy(dtype=np.int64, na_value=-1)
+        lengths = np.where(numbers >= 0, 9, 0)
+        return numbers, lengths, np.zeros(len(numbers), dtype=bool)
+    digits = id_digits(values)
+    lengths = digits.str.len().to_numpy()
+    symbols = id_has_symbols(values)
+    valid = np.isin(lengths, ID_LENGTHS) & ~symbols
+    numbers = pd.to_numeric(digits.where(valid, None)).fillna(-1).to_numpy(dtype=np.int64)
+    return np.where(valid, numbers, -1), lengths, symbols
+
+
+# مجموع خانتي ضعف الرقم (7 -> 14 -> 1+4=5) لكل خانة 0-9
+_DOUBLED_DIGIT_SUM = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.int32)
+
+
+def luhn_valid(numbers):
+    """خانة التحقق لأرقام من 9 خانات (أوزان 1،2،1،2... من اليسار، مجموع الخانات يقبل القسمة على 10)"""
+    rest = numbers.astype(np.int32)
+    total = np.zeros(len(rest), dtype=np.int32)
+    # من الخانة الأخيرة (وزن 1) إلى الأولى: حلقة على الخانات التسع لا على الصفوف
+    for i in range(9):
+        rest, digit = np.divmod(rest, 10)
+        total += _DOUBLED_DIGIT_SUM[digit] if i % 2 else digit
+    return total % 10 == 0
+
+
+class QualityReport:
+    """نتائج فحص الجودة لنسخة بيانات: مواقع الصفوف ورموز المشاكل، مع ملخص بعدد كل مشكلة"""
+
+    def __init__(self, rows, codes, checked):
+        order = np.lexsort((codes, rows))
+        self.rows = rows[order].astype(np.int32)
+        self.codes = codes[order].astype(np.uint8)
+        self.checked = checked
+        counts = np.bincount(self.codes, minlength=max(ISSUES) + 1)
+        self.summary = {label: int(counts[code]) for code, (label, _) in ISSUES.items()}
+        self._csv = None
+
+    @classmethod
+    def from_frame(cls, df):
+        n = len(df)
+        found = []
+
+        def flag(mask, code):
+            positions = np.flatnonzero(mask)
+            if len(positions):
+                found.append((positions, np.full(len(positions), code, dtype=np.uint8)))
+
+        ids = np.full(n, -1, dtype=np.int64)
+        if ID_COL in df.columns:
+            ids, lengths, symbols = _id_numbers(df[ID_COL])
+            has_id = ids >= 0
+            flag(lengths == 0, 1)
+            flag((lengths > 0) & ~np.isin(lengths, ID_LENGTHS), 2)
+            flag(symbols, 10)
+            flag(has_id & ~luhn_valid(np.maximum(ids, 0)), 3)
+            present = ids[has_id]
+            uniq, counts = np.unique(present, return_counts=True)
+            flag(has_id & np.isin(ids, uniq[counts > 1]), 4)
+
+        if WIFE_ID_COL in df.columns:
+            wives, wife_lengths, wife_symbols = _id_numbers(df[WIFE_ID_COL])
+            has_wife = wives >= 0
+            flag((has_wife & ~luhn_valid(np.maximum(wives, 0))) | ((wife_lengths > 0) & ~np.isin(wife_lengths, ID_LENGTHS)), 5)
+            flag(wife_symbols, 11)
+            flag(has_wife & (wives == ids), 6)
+            # نفس هوية الزوجة مع أكثر من رقم هوية زوج مختلف
+            pairs = pd.DataFrame({"wife": wives[has_wife], "husband": ids[has_wife]}).drop_duplicates()
+            husbands = pairs["wife"].value_counts()
+            flag(has_wife & np.isin(wives, husbands.index[husbands.to_numpy() > 1].to_numpy()), 7)
+
+        if PHONE_COL in df.columns:
+            raw = df[PHONE_COL]
+            present = (raw.notna() & (raw.astype(str).str.strip() != "")).to_numpy()
+            phones = normalize_phone(raw.array)
+            mobile_ok = (phones.str.len() == 9) & phones.str.startswith("5")
+            landline_ok = phones.str.len() == 8
+            flag(present & ~(mobile_ok | landline_ok).to_numpy(), 8)
+
+        if COUNT_COL in df.columns:
+            counts = pd.to_numeric(pd.Series(df[COUNT_COL].array), errors="coerce")
+            low, high = HOUSEHOLD_RANGE
+            flag((counts.notna() & ((counts < low) | (counts > high))).to_numpy(), 9)
+
+        if found:
+            rows = np.concatenate([r for r, _ in found])
+            codes = np.concatenate([c for _, c in found])
+        else:
+            rows, codes = np.array([], dtype=np.int64), np.array([], dtype=np.uint8)
+        return cls(rows, codes, n)
+
+    def to_frame(self, df, limit=None):
+        """جدول التقرير: الموقع في السجل، الاسم، رقم الهوية، المشكلة، القيمة كما أُدخلت وبعد التوحيد"""
+        rows, codes = self.rows[:limit], self.codes[:limit]
+        values = np.full(len(rows), "", dtype=object)
+        normalized = np.full(len(rows), "", dtype=object)
+        for code, (_, col) in ISSUES.items():
+            mask = codes == code
+            if mask.any() and col in df.columns:
+                picked = df[col].iloc[rows[mask]]
+                normalizer = _NORMALIZERS.get(col)
+                if normalizer is not None:
+                    normalized[mask] = normalizer(picked).to_numpy(dtype=object)
+                if pd.api.types.is_integer_dtype(picked.dtype) and col in (ID_COL, WIFE_ID_COL):
+                    # العمود المضغوط لا يحفظ الأصفار البادئة: القيمة المعروضة هي الرقم بعد التوحيد
+                    picked = normalize_id(picked)
+                values[mask] = picked.astype(object).fillna("").astype(str).to_numpy()
+        labels = np.array([""] + [label for label, _ in ISSUES.values()], dtype=object)
+        return pd.DataFrame({
+            ROW_COL: rows + 1,
+            "الاسم": df[NAME_COL].iloc[rows].to_numpy() if NAME_COL in df.columns else "",
+            "رقم الهوية": normalize_id(df[ID_COL].iloc[rows]).to_numpy() if ID_COL in df.columns else "",
+            ISSUE_COL: labels[codes],
+            VALUE_COL: values,
+            NORMALIZED_COL: normalized,
+        })
+
+    def to_csv_bytes(self, df):
+        """التقرير كاملاً كملف CSV (يُبنى مرة واحدة لكل نسخة بيانات)"""
+        if self._csv is None:
+            # utf-8-sig ليفتحه Excel بالعربية مباشرة (مثل نتائج التحقق الجماعي)
+            self._csv = self.to_frame(df).to_csv(index=False).encode("utf-8-sig")
+        return self._csv
+
+    def memory_usage(self):
+        return int(self.rows.nbytes + self.codes.nbytes + (len(self._csv) if self._csv else 0))
+
+    def __len__(self):
+        return len(self.rows)
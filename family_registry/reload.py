@@ -0,0 +1,216 @@
+"""إعادة التحميل التلقائي عند تغيّر ملفات البيانات مع تحديث تزايدي للفهارس.
+
+المخزن (DataStore) يراقب مصادر البيانات في خيط خلفي: عند تغيّر الحجم أو وقت التعديل أو قائمة الملفات
+تُحسب بصمات المحتوى، وإذا تغيّر المحتوى فعلاً تُقرأ المصادر (غير المتغيرة من لقطاتها) وتُدمج، ثم يُقارن
+الناتج بالقديم صفاً بصف حسب رقم الهوية.
+الصفوف غير المتغيرة تحتفظ بمواقعها، فلا يُحدَّث في فهرس البحث إلا مفاتيح الصفوف المتغيرة.
+النسخة الجديدة تُبنى كاملة ثم تُستبدل بمرجع واحد، فلا ترى أي جلسة بيانات نصف محمّلة.
+"""
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+from .compact import restore_categories
+from .dataset import FamilyDataset
+from .loader import find_data_files, load_data, load_sources, sources_version
+from .lookup import ID_COL, normalize_id
+from .names import NAME_COL, NameIndex
+from .snapshot import file_hash
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================================================================
+# مقارنة نسختين من الجدول
+# ==============================================================================
+
+def _group_signatures(df):
+    """بصمة كل رقم هوية: (مجموع بصمات صفوفه، عددها). الصفوف بدون هوية تُعامل كمجموعة واحدة"""
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    ids = normalize_id(df[ID_COL]).to_numpy(dtype=object)
+    return pd.DataFrame({"sum": hashes, "count": 1}).groupby(ids, sort=False).sum(), ids
+
+
+def diff_frames(old_df, new_df):
+    """الفرق بين نسختين حسب رقم الهوية.
+
+    يعيد None إذا اختلفت الأعمدة (لا يمكن التحديث التزايدي)، وإلا قاموساً فيه:
+    removed: مواقع الصفوف القديمة التي حُذفت أو تغيّرت، added: مواقع الصفوف الجديدة التي أُضيفت أو تغيّرت،
+    وأعداد أرقام الهوية المضافة والمحذوفة والمعدلة.
+    """
+    if list(old_df.columns) != list(new_df.columns) or ID_COL not in new_df.columns:
+        return None
+
+    old_sig, old_ids = _group_signatures(old_df)
+    new_sig, new_ids = _group_signatures(new_df)
+    joined = old_sig.join(new_sig, how="outer", lsuffix="_old", rsuffix="_new")
+
+    in_old = joined["count_old"].notna()
+    in_new = joined["count_new"].notna()
+    same = in_old & in_new & (joined["sum_old"] == joined["sum_new"]) & (joined["count_old"] == joined["count_new"])
+    stale = joined.index[~same]
+
+    return {
+        "removed": np.flatnonzero(pd.Index(stale).get_indexer(old_ids) >= 0),
+        "added": np.flatnonzero(pd.Index(stale).get_indexer(new_ids) >= 0),
+        "ids_added": int((in_new & ~in_old).sum()),
+        "ids_removed": int((in_old & ~in_new).sum()),
+        "ids_changed": int((in_old & in_new & ~same).sum()),
+    }
+
+
+def patch_dataset(old, new_df, diff, version=None, source="", load_report=None):
+    """بناء نسخة جديدة من البيانات بتطبيق الفرق على النسخة القديمة (بدون تعديل القديمة)
+
+    الصفوف المحذوفة/المعدلة تُملأ مواقعها بالصفوف الجديدة، والزائد يُضاف في النهاية.
+    إذا كانت الصفوف الجديدة أقل تُنقل صفوف من آخر الجدول لسد الفراغات.
+    """
+    old_df = old.df
+    n_old = len(old_df)
+    removed, added = diff["removed"], diff["added"]
+    reuse = min(len(removed), len(added))
+
+    # take: مصدر كل صف في الجدول الناتج داخل [القديم ثم الجديد]
+    take = np.arange(n_old)
+    take[removed[:reuse]] = n_old + added[:reuse]
+    moved_from = moved_to = np.array([], dtype=np.int64)
+    if len(added) > reuse:
+        take = np.concatenate([take, n_old + added[reuse:]])
+    elif len(removed) > reuse:
+        holes = removed[reuse:]
+        n_final = n_old - len(holes)
+        tail = np.arange(n_final, n_old)
+        moved_from = tail[~np.isin(tail, holes)]
+        moved_to = holes[holes < n_final]
+        take[moved_to] = take[moved_from]
+        take = take[:n_final]
+
+    df = pd.concat([old_df, new_df], ignore_index=True).take(take).reset_index(drop=True)
+    df = restore_categories(df, old_df)
+
+    index = old.index.copy()
+    new_positions = np.concatenate([removed[:reuse], np.arange(n_old, n_old + len(added) - reuse)])
+    index.patch(
+        old_df, np.concatenate([removed, moved_from]).astype(np.int64),
+        df, np.concatenate([new_positions, moved_to]).astype(np.int64),
+    )
+
+    # فهرس الأسماء والشجرة مضغوطان وغير قابلين للتعديل: يُعاد بناؤهما فقط إذا تغيّرت الصفوف أو مواقعها
+    names, tree, quality, browse = old.names, old.tree, old.quality, old.browse
+    if len(removed) or len(added):
+        quality = browse = FamilyDataset.BUILD
+        if NAME_COL in df.columns:
+            names = NameIndex.from_series(df[NAME_COL])
+            tree = FamilyDataset.BUILD
+
+    return FamilyDataset(df, version=version, source=source, load_report=load_report, index=index, names=names,
+                         tree=tree, quality=quality, browse=browse)
+
+
+# ==============================================================================
+# المخزن المشترك مع المراقبة في الخلفية
+# ==============================================================================
+
+class DataStore:
+    """يحتفظ بالنسخة الحالية من البيانات ويستبدلها ذرياً عند تغيّر ملفات البيانات.
+
+    file_path: ملف أو قائمة ملفات ثابتة؛ افتراضياً كل المصادر الموجودة (find_data_files) في كل فحص.
+    """
+
+    def __init__(self, file_path=None, poll_interval=30, watch=True):
+        self.file_path = file_path
+        self.poll_interval = poll_interval
+        self.last_reload = {}
+        self.reload_count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stat = None
+        self._hash = None
+        self._dataset = None
+
+        self.check()
+        if watch:
+            threading.Thread(target=self._watch, name="family-data-watcher", daemon=True).start()
+
+    @property
+    def dataset(self):
+        """النسخة الحالية (قراءة المرجع عملية ذرية؛ النسخة نفسها لا تتغير بعد نشرها)"""
+        return self._dataset
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("فشل فحص ملف البيانات")
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        """فحص المصادر وإعادة التحميل إذا تغيّر محتواها. يعيد True إذا نُشرت نسخة جديدة"""
+        with self._lock:
+            paths = self._paths()
+            stat = sources_version(paths)
+            if stat == self._stat:
+                return False
+            if stat is None:
+                # الملفات اختفت مؤقتاً (أثناء النسخ مثلاً): نبقي النسخة الحالية
+                return False
+            paths = [p for p in paths if os.path.exists(p)]
+
+            content_hash = tuple(file_hash(p) for p in paths)
+            if content_hash == self._hash and self._dataset is not None:
+                # لُمس الملف أو نُسخ بدون تغيير المحتوى
+                metrics.incr("reload.unchanged")
+                self._stat = stat
+                return False
+
+            published = self._reload(paths, stat)
+            if published:
+                self._stat, self._hash = stat, content_hash
+            return published
+
+    def _paths(self):
+        if self.file_path:
+            return [self.file_path] if isinstance(self.file_path, str) else list(self.file_path)
+        return find_data_files()
+
+    def _reload(self, paths, stat):
+        start = time.perf_counter()
+        old = self._dataset
+        source = ", ".join(paths)
+        if old is None:
+            dataset = load_data(paths)
+            info = {"mode": "full"}
+        else:
+            # المصادر غير المتغيرة تُقرأ من لقطاتها، والمتغيرة تُحلَّل وتُكتب لقطتها
+            df, report = load_sources(paths)
+            if df is None:
+                logger.warning("تعذرت قراءة %s، الإبقاء على النسخة الحالية", source)
+                return False
+            with metrics.timer("reload.diff"):
+                diff = diff_frames(old.df, df)
+            if diff is None:
+                dataset = FamilyDataset(df, version=stat, source=source, load_report=report)
+                info = {"mode": "full"}
+            else:
+                dataset = patch_dataset(old, df, diff, version=stat, source=source, load_report=report)
+                info = {"mode": "incremental", **{k: v for k, v in diff.items() if k.startswith("ids_")}}
+
+        if dataset is None:
+            return False
+        seconds = time.perf_counter() - start
+        metrics.observe(f"reload.{info['mode']}", seconds)
+        info.update(source=source, rows=len(dataset), seconds=round(seconds, 3), at=time.time())
+        # النشر: استبدال مرجع واحد
+        self._dataset = dataset
+        self.last_reload = info
+        self.reload_count += 1
+        logger.info("تم تحميل نسخة جديدة من البيانات: %s", info)
+        return True
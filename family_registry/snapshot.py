@@ -0,0 +1,207 @@
+"""لقطة ثنائية (Snapshot) للبيانات بعد التنظيف لتسريع التشغيل البارد.
+
+تُحفظ اللقطة بجانب ملف وصف (manifest) يحتوي مسار المصدر وحجمه ووقت تعديله وبصمة محتواه.
+عند التشغيل: إذا تطابق الحجم ووقت التعديل تُقرأ اللقطة مباشرة، وإذا تغيّر وقت التعديل فقط
+(نسخ/لمس الملف) تُحسب بصمة المحتوى ويُعاد استخدام اللقطة إن لم يتغيّر المحتوى.
+
+الفهارس المبنية على الجدول (البحث، الأسماء، الشجرة، الجودة، التصفح) تُحفظ أيضاً بجانب اللقطة
+ويسجلها نفس ملف الوصف، فالتشغيل من اللقطة لا يعيد بناءها. كتابة لقطة جدول جديدة تلغي الفهارس القديمة.
+
+تشغيل مقارنة زمن التشغيل:
+    python -m family_registry snapshot-timing [مسار ملف البيانات]
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# مجلد اللقطات (يمكن تغييره عبر متغير البيئة)
+CACHE_DIR = os.environ.get("ALASTAL_CACHE_DIR", ".snapshot_cache")
+
+# رقم صيغة اللقطة: يُرفع عند تغيير طريقة التنظيف أو بنية الفهارس حتى لا تُقرأ لقطات قديمة
+SNAPSHOT_FORMAT = 4
+
+try:
+    import pyarrow  # noqa: F401 (Feather يحتاج pyarrow)
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """بصمة SHA-256 لمحتوى الملف"""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _paths(file_path, cache_dir=None):
+    key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(cache_dir or CACHE_DIR, key)
+    return base + ".json", base
+
+
+def _source_stat(file_path):
+    stat = os.stat(file_path)
+    return {"path": os.path.abspath(file_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, manifest_path)
+
+
+def load_snapshot(file_path, cache_dir=None):
+    """قراءة اللقطة إذا كانت مطابقة للملف المصدر. يعيد (الجدول، تقرير القراءة الأصلي) أو (None, None)"""
+    manifest_path, base = _paths(file_path, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    if not manifest or manifest.get("format") != SNAPSHOT_FORMAT:
+        return None, None
+
+    try:
+        source = _source_stat(file_path)
+        if source["path"] != manifest["path"] or source["size"] != manifest["size"]:
+            return None, None
+        if source["mtime_ns"] != manifest["mtime_ns"]:
+            # تغيّر وقت التعديل فقط: نتحقق من المحتوى قبل إعادة البناء
+            if file_hash(file_path) != manifest["sha256"]:
+                return None, None
+            manifest["mtime_ns"] = source["mtime_ns"]
+            _write_manifest(manifest_path, manifest)
+
+        snapshot_path = base + "." + manifest["kind"]
+        if manifest["kind"] == "feather":
+            df = pd.read_feather(snapshot_path)
+        else:
+            df = pd.read_pickle(snapshot_path)
+    except Exception:
+        return None, None
+    # نعيد ترتيب الأعمدة كما كانت (Feather يحفظ الأعمدة كنصوص)
+    df.columns = manifest.get("columns", list(df.columns))
+    return df, manifest.get("ingest")
+
+
+def save_snapshot(file_path, df, ingest=None, cache_dir=None):
+    """كتابة لقطة للجدول بعد التنظيف (مع تقرير القراءة). يعيد True عند النجاح"""
+    manifest_path, base = _paths(file_path, cache_dir)
+    try:
+        os.makedirs(cache_dir or CACHE_DIR, exist_ok=True)
+        manifest = _source_stat(file_path)
+        manifest.update(format=SNAPSHOT_FORMAT, sha256=file_hash(file_path), columns=[str(c) for c in df.columns], ingest=ingest)
+
+        frame = df.reset_index(drop=True)
+        frame.columns = manifest["columns"]
+        kind = "pickle"
+        if HAS_ARROW:
+            try:
+                frame.to_feather(base + ".feather.tmp")
+                kind = "feather"
+            except Exception:
+                # أعمدة بأنواع مختلطة لا يقبلها Arrow: نرجع لـ pickle
+                pass
+        if kind == "pickle":
+            frame.to_pickle(base + ".pickle.tmp")
+        os.replace(base + "." + kind + ".tmp", base + "." + kind)
+
+        manifest["kind"] = kind
+        _write_manifest(manifest_path, manifest)
+        return True
+    except Exception:
+        return False
+
+
+def save_indexes(file_path, indexes, rows, cache_dir=None):
+    """حفظ فهارس الجدول (قاموس الاسم -> الفهرس) بجانب لقطته. يعيد True عند النجاح
+
+    تُسجَّل في ملف الوصف الحالي فقط إذا كان ما زال يصف الملف المصدر كما هو الآن.
+    """
+    manifest_path, base = _paths(file_path, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    try:
+        source = _source_stat(file_path)
+        if not manifest or manifest.get("format") != SNAPSHOT_FORMAT or any(
+                source[k] != manifest[k] for k in ("path", "size", "mtime_ns")):
+            return False
+        with open(base + ".indexes.pickle.tmp", "wb") as f:
+            pickle.dump(indexes, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(base + ".indexes.pickle.tmp", base + ".indexes.pickle")
+        manifest["indexes"] = {"rows": rows, "names": sorted(indexes)}
+        _write_manifest(manifest_path, manifest)
+        return True
+    except Exception:
+        return False
+
+
+def load_indexes(file_path, rows, cache_dir=None):
+    """قراءة الفهارس المحفوظة إذا كانت لنفس لقطة الجدول (بعد load_snapshot). يعيد قاموس الفهارس أو None"""
+    manifest_path, base = _paths(file_path, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    if not manifest or manifest.get("format") != SNAPSHOT_FORMAT or (manifest.get("indexes") or {}).get("rows") != rows:
+        return None
+    try:
+        source = _source_stat(file_path)
+        if any(source[k] != manifest[k] for k in ("path", "size", "mtime_ns")):
+            return None
+        with open(base + ".indexes.pickle", "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+# ==============================================================================
+# مقارنة زمن التشغيل البارد
+# ==============================================================================
+
+def compare_startup(file_path):
+    """قياس زمن load_data() كاملاً (قراءة، توحيد، ضغط، بناء الفهارس) بدون لقطة مقابل التشغيل من اللقطة.
+
+    لقطة القياس تُكتب في مجلد مؤقت فلا تمس لقطة التطبيق في CACHE_DIR.
+    """
+    from .loader import load_data
+
+    t0 = time.perf_counter()
+    cold = load_data(file_path, use_snapshot=False)
+    cold_s = time.perf_counter() - t0
+    if cold is None:
+        return {"error": f"تعذرت قراءة {file_path}"}
+
+    with tempfile.TemporaryDirectory(prefix="alastal-snapshot-") as cache_dir:
+        # التشغيل الأول يكتب لقطة الجدول والفهارس، والثاني يقرؤهما
+        load_data(file_path, cache_dir=cache_dir)
+        manifest = _read_manifest(_paths(file_path, cache_dir)[0]) or {}
+
+        t0 = time.perf_counter()
+        warm = load_data(file_path, cache_dir=cache_dir)
+        warm_s = time.perf_counter() - t0
+
+    identical = warm is not None and warm.df.equals(cold.df) and all(
+        np.array_equal(warm.index.tables[f].keys, cold.index.tables[f].keys)
+        and np.array_equal(warm.index.tables[f].positions, cold.index.tables[f].positions)
+        for f in cold.index.tables
+    ) and np.array_equal(warm.quality.codes, cold.quality.codes)
+    return {
+        "rows": len(cold),
+        "kind": manifest.get("kind"),
+        "indexes_cached": bool(manifest.get("indexes")),
+        "cold_seconds": round(cold_s, 4),
+        "warm_seconds": round(warm_s, 4),
+        "speedup": round(cold_s / warm_s, 1) if warm_s else None,
+        "identical": identical,
+    }
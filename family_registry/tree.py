@@ -0,0 +1,294 @@
+"""شجرة العائلة المستنتجة من الأسماء الرباعية (الاسم، الأب، الجد، ...، العائلة).
+
+الأب يُستنتج من سلسلة الاسم: "أحمد محمد علي الأسطل" أبوه من يبدأ اسمه بـ "محمد علي".
+إذا احتوى الاسم خانة إضافية (اسم خماسي) تُطابق ثلاث خانات أولاً. تُربط الحافة فقط إذا كان المرشح
+شخصاً واحداً بالضبط؛ عند تعدد المرشحين (أسماء متشابهة) يبقى الفرد بدون أب ويُحسب كحالة غامضة.
+الصفوف التي تحمل نفس رقم الهوية هي الشخص نفسه (عقدة واحدة)، ولا يُربط شخص بنفسه.
+
+تُبنى الشجرة مرة واحدة لكل نسخة بيانات كمصفوفات NumPy: أب كل عقدة، الأبناء بصيغة CSR، العمق،
+حجم الذرية، والفرع (المفقود يُورث من الأب)، مع قوائم أفراد كل فرع مرتبة مسبقاً.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .lookup import ID_COL, normalize_id
+from .names import NAME_COL, normalize_arabic, normalize_arabic_series
+
+BRANCH_COL = "الفرع"
+
+# الأسماء المركبة تُعامل كخانة واحدة: "عبد الله"، "أبو بكر"، "نور الدين"، "فتح الله"
+_COMPOUND_PREFIX = re.compile(r"(^| )(عبد|ابو|أبو) ")
+_COMPOUND_SUFFIX = re.compile(r" (الدين|الله)(?= |$)")
+
+
+def _chains(names):
+    """خانات كل اسم (بعد التوحيد) بدون اسم العائلة، واسم العائلة الغالب"""
+    tokens = [
+        _COMPOUND_SUFFIX.sub(r"_\1", _COMPOUND_PREFIX.sub(r"\1\2_", name)).split(" ") if name else []
+        for name in names
+    ]
+    lasts = pd.Series([t[-1] for t in tokens if len(t) > 1], dtype=object)
+    family = lasts.mode().iloc[0] if len(lasts) else ""
+    return [t[:-1] if len(t) > 1 and t[-1] == family else t for t in tokens], family
+
+
+def _display_chain(name, family):
+    """خانات الاسم كما كُتب في السجل (للعرض) بدون اسم العائلة"""
+    tokens = _COMPOUND_SUFFIX.sub(r"_\1", _COMPOUND_PREFIX.sub(r"\1\2_", " ".join(str(name).split()))).split(" ")
+    if len(tokens) > 1 and normalize_arabic(tokens[-1]) == family:
+        tokens = tokens[:-1]
+    return [t.replace("_", " ") for t in tokens]
+
+
+def _key(chain, start, size):
+    return " ".join(chain[start:start + size]) if len(chain) >= start + size else ""
+
+
+def _key_codes(chains, size):
+    """أرقام مفاتيح المطابقة لكل اسم فريد: (مفتاح الشخص نفسه، مفتاح أبيه)، و-1 إذا كان الاسم أقصر من المطلوب"""
+    self_keys = [_key(c, 0, size) or None for c in chains]
+    parent_keys = [_key(c, 1, size) or None for c in chains]
+    codes, _ = pd.factorize(np.array(self_keys + parent_keys, dtype=object))
+    return codes[:len(chains)], codes[len(chains):]
+
+
+def _link(parent, self_codes, parent_codes, allowed=None):
+    """ربط كل فرد بدون أب بالشخص الوحيد الذي يطابق مفتاحه مفتاح الأب. يعيد عدد المرشحين لكل فرد"""
+    has_self = self_codes >= 0
+    counts = np.bincount(self_codes[has_self], minlength=max(self_codes.max(initial=0), parent_codes.max(initial=0)) + 1)
+    owner = np.full(len(counts), -1)
+    owner[self_codes[has_self]] = np.flatnonzero(has_self)
+
+    wanted = np.maximum(parent_codes, 0)
+    matches = np.where(parent_codes >= 0, counts[wanted], 0)
+    candidate = owner[wanted]
+    link = (parent < 0) & (matches == 1) & (candidate != np.arange(len(parent)))
+    if allowed is not None:
+        link &= allowed(np.maximum(candidate, 0))
+    parent[link] = candidate[link]
+    return matches
+
+
+def _children_csr(parent):
+    """قوائم الأبناء لكل عقدة (CSR): (الأبناء مرتبين حسب الأب، بداية كل أب)"""
+    kids = np.flatnonzero(parent >= 0)
+    order = kids[np.argsort(parent[kids], kind="stable")].astype(np.int32)
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(parent[kids], minlength=len(parent)))))
+    return order, offsets
+
+
+def _gather(order, offsets, nodes):
+    """كل أبناء مجموعة عقد دفعة واحدة (بدون حلقة على العقد)"""
+    lengths = offsets[nodes + 1] - offsets[nodes]
+    total = int(lengths.sum())
+    if not total:
+        return np.array([], dtype=np.int32)
+    starts = np.repeat(offsets[nodes] - (np.cumsum(lengths) - lengths), lengths)
+    return order[starts + np.arange(total)]
+
+
+def _levels(parent, children):
+    """العقد جيلاً بجيل من الجذور، والعمق لكل عقدة (-1 للعقد داخل حلقة)"""
+    depth = np.full(len(parent), -1, dtype=np.int32)
+    levels = []
+    frontier = np.flatnonzero(parent < 0)
+    while len(frontier):
+        depth[frontier] = len(levels)
+        levels.append(frontier)
+        frontier = _gather(*children, frontier)
+    return levels, depth
+
+
+def _break_cycles(parent, depth):
+    """قطع الحلقات (أسماء متبادلة مثل "أ ب أ" و "ب أ ب"): تُزال حافة واحدة من كل حلقة"""
+    broken = 0
+    for start in np.flatnonzero(depth < 0):
+        seen = set()
+        node = int(start)
+        while parent[node] >= 0 and node not in seen:
+            seen.add(node)
+            node = int(parent[node])
+        if parent[node] >= 0 and node in seen:
+            parent[node] = -1
+            broken += 1
+    return broken
+
+
+class FamilyTree:
+    """شجرة مضغوطة: كل عقدة شخص (صف أو مجموعة صفوف بنفس رقم الهوية)"""
+
+    def __init__(self, person_of_row, first_row, parent, children, depth, subtree, names, name_order, branch,
+                 branch_names, branch_inferred, stats):
+        self.person_of_row = person_of_row    # رقم العقدة لكل صف
+        self.first_row = first_row            # أول صف لكل عقدة (للعرض)
+        self.parent = parent                  # أب كل عقدة أو -1
+        self.children = children              # (الأبناء، بداية كل أب) بصيغة CSR
+        self.depth = depth                    # العمق من أعلى جد معروف (0 للجذور)
+        self.subtree = subtree                # عدد أفراد الذرية مع الشخص نفسه
+        self.names = names                    # الاسم كما في السجل لكل عقدة (Series)
+        self.name_order = name_order          # ترتيب الاسم أبجدياً (لقوائم الفروع)
+        self.branch = branch                  # رقم الفرع لكل عقدة أو -1
+        self.branch_names = branch_names
+        self.branch_inferred = branch_inferred  # الفرع مستنتج من الأب وليس من السجل
+        self.stats = stats
+        self._build_branch_views()
+
+    @classmethod
+    def from_frame(cls, df):
+        """بناء الشجرة من جدول البيانات (مرة واحدة لكل نسخة)"""
+        n_rows = len(df)
+        if NAME_COL in df.columns:
+            name_codes, unique_names = pd.factorize(normalize_arabic_series(df[NAME_COL].to_numpy()))
+            chains, family = _chains(list(unique_names))
+            # ترتيب أبجدي للأسماء الفريدة فقط (بدل ترتيب كل الصفوف)
+            name_rank = np.argsort(np.argsort(np.asarray(unique_names, dtype=object), kind="stable"))
+        else:
+            name_codes, chains, family = np.zeros(n_rows, dtype=np.int64), [[]], ""
+            name_rank = np.zeros(1, dtype=np.int64)
+
+        # الأشخاص: الصفوف بنفس رقم الهوية شخص واحد، والصف بدون هوية شخص مستقل
+        if ID_COL in df.columns:
+            ids = normalize_id(df[ID_COL]).to_numpy(dtype=object)
+            person_of_row, _ = pd.factorize(np.where(ids == "", None, ids))
+        else:
+            person_of_row = np.full(n_rows, -1)
+        no_id = person_of_row < 0
+        person_of_row[no_id] = person_of_row.max(initial=-1) + 1 + np.arange(no_id.sum())
+        person_of_row = person_of_row.astype(np.int32)
+        n = int(person_of_row.max(initial=-1)) + 1
+        first_row = np.zeros(n, dtype=np.int64)
+        first_row[person_of_row[::-1]] = np.arange(n_rows)[::-1]
+        person_name = name_codes[first_row]
+
+        # الفرع المسجل لكل شخص (يُستخدم للتمييز بين الأسماء المتشابهة ثم يُورث للمفقود)
+        if BRANCH_COL in df.columns:
+            branch_codes, branch_names = pd.factorize(df[BRANCH_COL].astype(object).where(df[BRANCH_COL].notna(), None))
+            branch = branch_codes[first_row].astype(np.int32)
+        else:
+            branch, branch_names = np.full(n, -1, dtype=np.int32), []
+
+        # المفاتيح تُرقَّم على مستوى الأسماء الفريدة ثم تُنقل للأشخاص
+        keys = {size: tuple(codes[person_name] for codes in _key_codes(chains, size)) for size in (3, 2)}
+        # المطابقة بخانتين لا تصح إذا كان اسم الجد معروفاً في الطرفين ومختلفاً
+        self_s3, child_p3 = keys[3]
+        same_grandfather = lambda cand: (child_p3 < 0) | (self_s3[cand] < 0)
+
+        parent = np.full(n, -1, dtype=np.int32)
+        _link(parent, *keys[3])
+        matches = _link(parent, *keys[2], allowed=same_grandfather)
+        # الأسماء المتشابهة: محاولة أخيرة بين المرشحين من نفس الفرع المسجل
+        n_branches = len(branch_names) + 1
+        _link(parent, *(np.where((k >= 0) & (branch >= 0), k * n_branches + branch, -1) for k in keys[2]),
+              allowed=same_grandfather)
+        ambiguous = (parent < 0) & (matches > 1)
+
+        children = _children_csr(parent)
+        levels, depth = _levels(parent, children)
+        cycles = 0
+        if (depth < 0).any():
+            cycles = _break_cycles(parent, depth)
+            children = _children_csr(parent)
+            levels, depth = _levels(parent, children)
+
+        subtree = np.ones(n, dtype=np.int32)
+        for level in reversed(levels[1:]):
+            np.add.at(subtree, parent[level], subtree[level])
+
+        # الفرع المفقود يُورث من الأب جيلاً بجيل
+        inferred = np.zeros(n, dtype=bool)
+        for level in levels[1:]:
+            missing = level[branch[level] < 0]
+            branch[missing] = branch[parent[missing]]
+            inferred[missing] = branch[missing] >= 0
+
+        names = (df[NAME_COL] if NAME_COL in df.columns else pd.Series("", index=df.index)).iloc[first_row].reset_index(drop=True)
+        stats = {
+            "persons": n,
+            "linked": int((parent >= 0).sum()),
+            "ambiguous": int(ambiguous.sum()),
+            "roots": int((parent < 0).sum()),
+            "generations": len(levels),
+            "cycles_broken": cycles,
+            "family_name": family,
+        }
+        return cls(person_of_row, first_row, parent, children, depth, subtree, names, name_rank[person_name],
+                   branch, list(branch_names), inferred, stats)
+
+    def _build_branch_views(self):
+        """أفراد كل فرع مرتبين (الجيل ثم الاسم) وملخص الفروع، محسوبة مرة واحدة"""
+        n_branches = len(self.branch_names)
+        has_branch = np.flatnonzero(self.branch >= 0)
+        order = has_branch[np.lexsort((self.name_order[has_branch], self.depth[has_branch], self.branch[has_branch]))]
+        counts = np.bincount(self.branch[has_branch], minlength=n_branches)
+        self.branch_members = (order.astype(np.int32), np.concatenate(([0], np.cumsum(counts))))
+
+        nodes = pd.DataFrame({"branch": self.branch[has_branch], "depth": self.depth[has_branch],
+                              "root": self.parent[has_branch] < 0, "inferred": self.branch_inferred[has_branch]})
+        grouped = nodes.groupby("branch")
+        summary = pd.DataFrame({
+            "الفرع": self.branch_names,
+            "عدد الأفراد": counts,
+            "الأجيال": grouped["depth"].nunique().reindex(range(n_branches), fill_value=0).to_numpy(),
+            "الجذور": grouped["root"].sum().reindex(range(n_branches), fill_value=0).to_numpy(),
+            "فرع مستنتج": grouped["inferred"].sum().reindex(range(n_branches), fill_value=0).to_numpy(),
+        })
+        self.branch_summary = summary.sort_values("عدد الأفراد", ascending=False, kind="stable").reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # الاستعلام
+    # ------------------------------------------------------------------
+
+    def node(self, node):
+        """بيانات عقدة للعرض"""
+        start, end = self.children[1][node], self.children[1][node + 1]
+        b = self.branch[node]
+        return {
+            "name": self.names.iloc[node],
+            "row": int(self.first_row[node]),
+            "depth": int(self.depth[node]),
+            "children": int(end - start),
+            "descendants": int(self.subtree[node] - 1),
+            "branch": self.branch_names[b] if b >= 0 else None,
+            "branch_inferred": bool(self.branch_inferred[node]),
+        }
+
+    def lineage(self, row):
+        """سلسلة النسب لصف: (العقد من الشخص صعوداً لأعلى جد مسجل، أسماء الأجداد الأعلى غير المسجلين)"""
+        node = int(self.person_of_row[row])
+        nodes = [self.node(node)]
+        while self.parent[node] >= 0:
+            node = int(self.parent[node])
+            nodes.append(self.node(node))
+        unresolved = _display_chain(self.names.iloc[node], self.stats["family_name"])[1:]
+        return nodes, unresolved
+
+    def children_of(self, row):
+        """أبناء الشخص المسجلون (بيانات العقد)"""
+        order, offsets = self.children
+        node = self.person_of_row[row]
+        return [self.node(int(c)) for c in order[offsets[node]:offsets[node + 1]]]
+
+    def members(self, branch, limit=None):
+        """أفراد فرع مرتبين حسب الجيل ثم الاسم: جدول (الاسم، الجيل، الأبناء، الذرية)"""
+        if branch not in self.branch_names:
+            return pd.DataFrame(columns=["الاسم", "الجيل", "الأبناء", "الذرية"])
+        b = self.branch_names.index(branch)
+        order, offsets = self.branch_members
+        nodes = order[offsets[b]:offsets[b + 1]][:limit]
+        child_offsets = self.children[1]
+        return pd.DataFrame({
+            "الاسم": self.names.iloc[nodes].to_numpy(),
+            "الجيل": self.depth[nodes] + 1,
+            "الأبناء": child_offsets[nodes + 1] - child_offsets[nodes],
+            "الذرية": self.subtree[nodes] - 1,
+        })
+
+    def memory_usage(self):
+        arrays = (self.person_of_row, self.first_row, self.parent, self.depth, self.subtree, self.name_order,
+                  self.branch, self.branch_inferred) + self.children + self.branch_members
+        return int(sum(a.nbytes for a in arrays) + self.names.memory_usage(deep=True, index=False))
+
+    def __len__(self):
+        return len(self.parent)
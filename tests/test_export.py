@@ -0,0 +1,116 @@
+"""الحزمة الثابتة: التشفير وفكه، واسترجاع السجلات من الشرائح، والتوليد التزايدي."""
+import base64
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import generate
+from family_registry.api import RECORD_KEYS
+from family_registry.compact import compact_frame
+from family_registry.dataset import FamilyDataset
+from family_registry.export import (
+    ENTRY_LEN, SHARDS_DIR, _lookup_hash, _record_key, export_static, seal, unseal,
+)
+from family_registry.lookup import ID_COL, PHONE_COL, normalize_id
+
+SALT = "test-salt"
+
+
+@pytest.mark.parametrize("plaintext", [
+    b"",
+    b"x",
+    "أحمد محمد الأسطل".encode("utf-8"),
+    json.dumps([{"name": "س" * 50}] * 3, ensure_ascii=False).encode("utf-8"),  # أكثر من كتلة 32 بايت
+])
+def test_seal_round_trip(plaintext):
+    key = _record_key(SALT, "401234567")
+    sealed = seal(key, plaintext)
+    assert unseal(key, sealed) == plaintext
+    # حتمي: نفس المدخلات -> نفس البايتات (أساس التوليد التزايدي)
+    assert seal(key, plaintext) == sealed
+
+
+def test_unseal_rejects_wrong_key_and_tampering():
+    key = _record_key(SALT, "401234567")
+    sealed = seal(key, "بطاقة".encode("utf-8"))
+    assert unseal(_record_key(SALT, "401234568"), sealed) is None
+    assert unseal(_record_key("other", "401234567"), sealed) is None
+    data = bytearray(base64.b64decode(sealed))
+    data[-1] ^= 1
+    assert unseal(key, base64.b64encode(bytes(data)).decode()) is None
+
+
+def _dataset(raw):
+    df, _ = compact_frame(raw.reset_index(drop=True))
+    return FamilyDataset(df)
+
+
+def _lookup(out_dir, id_):
+    """نفس خطوات صفحة الاستعلام: الشريحة من البصمة ثم فك تشفير السجل"""
+    config = json.load(open(os.path.join(out_dir, "config.json"), encoding="utf-8"))
+    digest = _lookup_hash(config["salt"], id_)
+    prefix = digest[:config["prefix_len"]]
+    path = os.path.join(out_dir, SHARDS_DIR, prefix + ".json")
+    if not os.path.exists(path):
+        return None
+    entries = json.load(open(path, encoding="utf-8"))
+    sealed = entries.get(digest[config["prefix_len"]:config["prefix_len"] + ENTRY_LEN])
+    if sealed is None:
+        return None
+    return json.loads(unseal(_record_key(config["salt"], id_), sealed))
+
+
+@pytest.fixture
+def raw():
+    return generate(300, seed=5)
+
+
+def test_export_round_trip(tmp_path, raw):
+    dataset = _dataset(raw)
+    report = export_static(dataset, str(tmp_path), salt=SALT, prefix_len=2)
+    ids = normalize_id(dataset.df[ID_COL])
+    assert report["ids"] == ids.nunique()
+    assert report["records"] == len(dataset.df)
+
+    for id_ in ids.unique()[:50]:
+        rows = dataset.df[(ids == id_).to_numpy()]
+        records = _lookup(str(tmp_path), id_)
+        assert [r[RECORD_KEYS[ID_COL]] for r in records] == [id_] * len(rows)
+        assert [r[RECORD_KEYS["الاسم"]] for r in records] == rows["الاسم"].tolist()
+    assert _lookup(str(tmp_path), "999999999") is None
+
+    # أرقام الهوية والهواتف لا تظهر في أي ملف
+    text = "".join(p.read_text(encoding="utf-8") for p in (tmp_path / SHARDS_DIR).iterdir())
+    assert not any(id_ in text for id_ in ids.unique())
+    phone = next(p for p in raw[PHONE_COL] if p)
+    assert phone not in text
+
+
+def test_export_is_incremental(tmp_path, raw):
+    out = str(tmp_path)
+    first = export_static(_dataset(raw), out, salt=SALT, prefix_len=2)
+    assert first["shards_written"] == first["shards"]
+
+    again = export_static(_dataset(raw), out, prefix_len=2)  # الملح يُقرأ من الحزمة الموجودة
+    assert again["shards_written"] == 0
+    assert again["version"] == first["version"]
+
+    changed = raw.copy()
+    changed.loc[0, PHONE_COL] = "0599000000"
+    report = export_static(_dataset(changed), out, prefix_len=2)
+    assert report["shards_written"] == 1
+    assert _lookup(out, normalize_id([changed.loc[0, ID_COL]])[0])[0][RECORD_KEYS[PHONE_COL]] == "0599000000"
+
+    small = raw.iloc[:5]
+    report = export_static(_dataset(small), out, prefix_len=2)
+    assert report["shards_removed"] == first["shards"] - report["shards"]
+    assert len(os.listdir(os.path.join(out, SHARDS_DIR))) == report["shards"]
+    assert _lookup(out, normalize_id([raw[ID_COL].iloc[-1]])[0]) is None
+
+
+def test_export_without_id_column(tmp_path, raw):
+    dataset = _dataset(raw.drop(columns=[ID_COL]))
+    with pytest.raises(ValueError):
+        export_static(dataset, str(tmp_path / "out"), salt=SALT)
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,131 @@
+"""فحص الجودة: خانة التحقق، المسار النصي والمضغوط، والتقرير."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import id_check_digit
+from family_registry.compact import compact_frame
+from family_registry.lookup import ID_COL, PHONE_COL, WIFE_ID_COL
+from family_registry.quality import (
+    COUNT_COL, ISSUE_COL, ISSUES, NORMALIZED_COL, VALUE_COL, QualityReport, luhn_valid,
+)
+
+CODE_OF = {label: code for code, (label, _) in ISSUES.items()}
+
+
+def _valid(body):
+    """رقم هوية صحيح من 8 خانات أولى"""
+    return body * 10 + int(id_check_digit(np.array([body]))[0])
+
+
+def _luhn_reference(number):
+    total = 0
+    for i, ch in enumerate(f"{number:09d}"):
+        d = int(ch) * (2 if i % 2 else 1)
+        total += d // 10 + d % 10
+    return total % 10 == 0
+
+
+def test_luhn_matches_reference():
+    numbers = np.random.default_rng(0).integers(0, 10**9, 5000)
+    expected = np.array([_luhn_reference(int(n)) for n in numbers])
+    np.testing.assert_array_equal(luhn_valid(numbers), expected)
+
+
+def test_luhn_detects_single_digit_change():
+    number = _valid(40123456)
+    assert luhn_valid(np.array([number]))[0]
+    changed = np.array([number + 10**p * (1 if (number // 10**p) % 10 < 9 else -1) for p in range(9)])
+    assert not luhn_valid(changed).any()
+
+
+def test_luhn_leading_zero():
+    number = _valid(1234567)  # 00123456X
+    assert number < 10**8
+    assert luhn_valid(np.array([number]))[0]
+
+
+def _report(df):
+    report = QualityReport.from_frame(df)
+    return sorted(zip(report.rows.tolist(), report.codes.tolist()))
+
+
+def _people(ids, wives=None, phones=None, counts=None):
+    n = len(ids)
+    return pd.DataFrame({
+        "الاسم": [f"اسم {i}" for i in range(n)],
+        ID_COL: ids,
+        PHONE_COL: phones or ["0599123456"] * n,
+        WIFE_ID_COL: wives or [""] * n,
+        COUNT_COL: counts or [3] * n,
+    })
+
+
+def test_text_and_compacted_paths_agree():
+    good, zero = _valid(40123456), _valid(1234567)
+    ids = [str(good), f"{zero:09d}", str(zero), str(good + 1), str(good), ""]
+    df = _people(ids)
+    compacted, _ = compact_frame(df.copy())
+    assert str(compacted[ID_COL].dtype) == "UInt32"
+    assert _report(compacted) == _report(df)
+    found = _report(df)
+    # 00123456X صحيح سواء كُتب بالأصفار أو حذفها Excel (8 خانات)
+    assert not [c for r, c in found if r in (1, 2) and c != CODE_OF["رقم هوية مكرر"]]
+    assert (3, CODE_OF["خانة التحقق في رقم الهوية خاطئة"]) in found
+    assert (5, CODE_OF["رقم هوية فارغ"]) in found
+
+
+@pytest.mark.parametrize("raw, code", [
+    ("1234567", "رقم الهوية ليس 9 خانات"),
+    ("40A123456", "رقم الهوية يحتوي على حروف أو رموز"),
+])
+def test_malformed_id_keeps_text_and_is_flagged(raw, code):
+    df = _people([str(_valid(40123456)), raw])
+    compacted, _ = compact_frame(df.copy())
+    assert not pd.api.types.is_integer_dtype(compacted[ID_COL].dtype)
+    found = _report(compacted)
+    assert (1, CODE_OF[code]) in found
+    # الرقم المعيب لا يُفحص بخانة التحقق ولا يُعد مكرراً
+    assert (1, CODE_OF["خانة التحقق في رقم الهوية خاطئة"]) not in found
+
+
+def test_separators_are_not_symbols():
+    good = _valid(40123456)
+    df = _people([f"{str(good)[:3]}-{str(good)[3:6]} {str(good)[6:]}", f"{good}.0"])
+    # نفس الرقم بصيغتين: مكرر فقط، بدون ملاحظة حروف أو رموز
+    assert _report(df) == [(0, CODE_OF["رقم هوية مكرر"]), (1, CODE_OF["رقم هوية مكرر"])]
+
+
+def test_duplicates_and_wife_collisions():
+    a, b, c, w = (_valid(x) for x in (40123456, 40123457, 40123458, 80123456))
+    df = _people([str(a), str(a), str(b), str(c)], wives=["", str(w), str(w), str(c)])
+    found = _report(df)
+    dup = CODE_OF["رقم هوية مكرر"]
+    assert (0, dup) in found and (1, dup) in found
+    assert (3, CODE_OF["هوية الزوجة مطابقة لهوية الفرد"]) in found
+    several = CODE_OF["هوية الزوجة مسجلة لأكثر من زوج"]
+    assert (1, several) in found and (2, several) in found
+
+
+def test_phones_and_counts():
+    good = [str(_valid(40123456 + i)) for i in range(5)]
+    df = _people(good, phones=["+970 599-123456", "12345", "082123456", "0412345678", ""],
+                 counts=[3, 0, 30, "abc", 25])
+    found = _report(df)
+    bad_phone, bad_count = CODE_OF["رقم هاتف غير صالح"], CODE_OF["عدد الأفراد خارج النطاق"]
+    assert [r for r, c in found if c == bad_phone] == [1, 3]
+    assert [r for r, c in found if c == bad_count] == [1, 2]
+
+
+def test_report_shows_value_as_entered_and_normalized():
+    good = str(_valid(40123456))
+    df = _people([good, "40A123456"], phones=["0599123456", "0412345678"])
+    report = QualityReport.from_frame(df)
+    table = report.to_frame(df)
+    phone = table[table[ISSUE_COL] == "رقم هاتف غير صالح"].iloc[0]
+    assert phone[VALUE_COL] == "0412345678"
+    assert phone[NORMALIZED_COL] == "412345678"
+    symbols = table[table[ISSUE_COL] == "رقم الهوية يحتوي على حروف أو رموز"].iloc[0]
+    assert symbols[VALUE_COL] == "40A123456"
+    assert symbols[NORMALIZED_COL] == "040123456"
+    assert report.to_csv_bytes(df).startswith(b"\xef\xbb\xbf")
@@ -0,0 +1,167 @@
+"""التحديث التزايدي (diff_frames + patch_dataset) يعطي نفس الفهارس التي يعطيها البناء الكامل."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate
+from family_registry.compact import compact_frame
+from family_registry.dataset import FamilyDataset
+from family_registry.lookup import ID_COL, PHONE_COL, LookupIndex
+from family_registry.reload import diff_frames, patch_dataset
+
+
+def _frame(raw):
+    df, _ = compact_frame(raw.reset_index(drop=True))
+    return df
+
+
+@pytest.fixture(scope="module")
+def base():
+    raw = generate(600, seed=3)
+    # صفوف بدون هوية تُعامل كمجموعة واحدة في المقارنة
+    raw.loc[[10, 20, 30], ID_COL] = ""
+    return raw
+
+
+def _added(raw):
+    extra = generate(40, seed=9)
+    return pd.concat([raw, extra], ignore_index=True)
+
+
+def _removed(raw):
+    return raw.drop(index=raw.index[5:60:3])
+
+
+def _changed(raw):
+    raw = raw.copy()
+    raw.loc[raw.index[::25], PHONE_COL] = "0599000000"
+    raw.loc[raw.index[7::40], "الفرع"] = "آل حسن"
+    return raw
+
+
+def _reordered(raw):
+    return raw.sample(frac=1, random_state=1)
+
+
+def _duplicate_ids(raw):
+    raw = raw.copy()
+    raw.loc[raw.index[100:110], ID_COL] = raw.loc[raw.index[200:210], ID_COL].to_numpy()
+    return raw
+
+
+def _mixed(raw):
+    return _duplicate_ids(_changed(_added(_removed(raw)))).sample(frac=1, random_state=2)
+
+
+CASES = {
+    "added": _added,
+    "removed": _removed,
+    "changed": _changed,
+    "reordered": _reordered,
+    "duplicate_ids": _duplicate_ids,
+    "mixed": _mixed,
+}
+
+
+def _sorted_rows(df):
+    text = df.astype(object).where(df.notna(), "").astype(str)
+    return text.sort_values(list(text.columns)).reset_index(drop=True)
+
+
+def _assert_same_index(patched, full):
+    assert isinstance(patched, LookupIndex)
+    assert patched.rows == full.rows
+    for field in LookupIndex.FIELDS:
+        a, b = patched.tables[field], full.tables[field]
+        np.testing.assert_array_equal(a.keys, b.keys, err_msg=field)
+        np.testing.assert_array_equal(a.offsets, b.offsets, err_msg=field)
+        np.testing.assert_array_equal(a.positions, b.positions, err_msg=field)
+
+
+def _assert_same_names(patched, full):
+    for attr in ("gram_keys", "offsets", "postings", "name_sizes"):
+        np.testing.assert_array_equal(getattr(patched, attr), getattr(full, attr), err_msg=attr)
+    for a, b in zip(patched.name_rows, full.name_rows):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(patched.names, full.names)
+
+
+def _assert_same_tree(patched, full, rows):
+    for attr in ("person_of_row", "first_row", "parent", "depth", "subtree", "branch", "branch_inferred"):
+        np.testing.assert_array_equal(getattr(patched, attr), getattr(full, attr), err_msg=attr)
+    assert patched.stats == full.stats
+    assert patched.branch_names == full.branch_names
+    for row in range(0, rows, 37):
+        assert patched.lineage(row) == full.lineage(row)
+
+
+def _assert_same_browse(patched, full):
+    assert patched.rows == full.rows
+    assert patched.facets.keys() == full.facets.keys()
+    for col, facet in full.facets.items():
+        assert patched.facets[col].labels == facet.labels
+        np.testing.assert_array_equal(patched.facets[col].codes, facet.codes)
+        pd.testing.assert_series_equal(patched.counts(col), full.counts(col))
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_patch_matches_full_rebuild(base, case):
+    old_df = _frame(base)
+    new_df = _frame(CASES[case](base))
+    old = FamilyDataset(old_df)
+
+    diff = diff_frames(old_df, new_df)
+    assert diff is not None
+    patched = patch_dataset(old, new_df, diff)
+
+    # نفس الصفوف (ترتيبها قد يختلف لأن الصفوف غير المتغيرة تحتفظ بمواقعها)
+    pd.testing.assert_frame_equal(_sorted_rows(patched.df), _sorted_rows(new_df))
+
+    full = FamilyDataset(patched.df)
+    _assert_same_index(patched.index, full.index)
+    _assert_same_names(patched.names, full.names)
+    _assert_same_tree(patched.tree, full.tree, len(full))
+    _assert_same_browse(patched.browse, full.browse)
+    np.testing.assert_array_equal(patched.quality.rows, full.quality.rows)
+    np.testing.assert_array_equal(patched.quality.codes, full.quality.codes)
+    assert patched.index.duplicate_ids() == full.index.duplicate_ids()
+
+
+def test_unchanged_frame_keeps_indexes(base):
+    df = _frame(base)
+    old = FamilyDataset(df)
+    diff = diff_frames(df, _frame(base))
+    assert len(diff["removed"]) == len(diff["added"]) == 0
+
+    patched = patch_dataset(old, _frame(base), diff)
+    assert patched.names is old.names
+    assert patched.tree is old.tree
+    _assert_same_index(patched.index, old.index)
+
+
+def test_old_dataset_is_not_modified(base):
+    old_df = _frame(base)
+    old = FamilyDataset(old_df)
+    before = {field: table.positions.copy() for field, table in old.index.tables.items()}
+
+    new_df = _frame(_mixed(base))
+    patch_dataset(old, new_df, diff_frames(old_df, new_df))
+
+    assert len(old.df) == len(base)
+    for field, positions in before.items():
+        np.testing.assert_array_equal(old.index.tables[field].positions, positions)
+
+
+def test_diff_counts(base):
+    old_df = _frame(base)
+    new = _changed(_removed(base))
+    diff = diff_frames(old_df, _frame(new))
+    removed_ids = set(base[ID_COL]) - set(new[ID_COL])
+    assert diff["ids_removed"] == len(removed_ids - {""})
+    assert diff["ids_added"] == 0
+    assert diff["ids_changed"] > 0
+
+
+def test_diff_refuses_other_columns(base):
+    df = _frame(base)
+    assert diff_frames(df, df.drop(columns=[PHONE_COL])) is None
@@ -0,0 +1,95 @@
+"""ربط الأب في شجرة العائلة من الأسماء الرباعية."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from family_registry.lookup import ID_COL
+from family_registry.names import NAME_COL
+from family_registry.tree import BRANCH_COL, FamilyTree
+
+ROWS = [
+    # (الاسم، رقم الهوية، الفرع)
+    ("حسن علي سالم الأسطل", "400000001", "آل علي"),        # 0 جذر
+    ("محمد حسن علي الأسطل", "400000002", None),            # 1 ابن 0
+    ("أحمد محمد حسن الأسطل", "400000003", None),           # 2 ابن 1
+    ("احمد محمد حسن الاسطل", "400000003", None),           # 3 نفس الشخص 2 (نفس الهوية)
+    ("خالد يوسف سالم الأسطل", "400000004", "آل علي"),      # 4
+    ("خالد يوسف ناصر الأسطل", "400000005", "آل حسن"),      # 5 اسم مشابه لـ 4
+    ("عمر خالد يوسف الأسطل", "400000006", "آل حسن"),       # 6 مرشحان: يُحسم بالفرع -> 5
+    ("سعيد خالد يوسف الأسطل", "400000007", None),          # 7 مرشحان بدون فرع: غامض
+    ("علي علي علي الأسطل", "400000008", None),             # 8 لا يُربط بنفسه
+    ("عبد الله حسن علي الأسطل", "400000009", None),        # 9 اسم مركب، ابن 0
+    ("محمود عبد الله حسن الأسطل", "400000010", None),      # 10 ابن 9
+    ("زياد أحمد محمد حسن الأسطل", "400000011", None),      # 11 اسم خماسي: مطابقة بثلاث خانات -> 2
+]
+
+
+@pytest.fixture(scope="module")
+def tree():
+    df = pd.DataFrame(ROWS, columns=[NAME_COL, ID_COL, BRANCH_COL])
+    return FamilyTree.from_frame(df)
+
+
+def _parent_row(tree, row):
+    parent = tree.parent[tree.person_of_row[row]]
+    return int(tree.first_row[parent]) if parent >= 0 else None
+
+
+def test_same_id_is_one_person(tree):
+    assert tree.person_of_row[2] == tree.person_of_row[3]
+    assert tree.stats["persons"] == len(ROWS) - 1
+
+
+@pytest.mark.parametrize("row, parent", [
+    (0, None), (1, 0), (2, 1), (3, 1), (9, 0), (10, 9), (11, 2),
+])
+def test_parent_from_name_chain(tree, row, parent):
+    assert _parent_row(tree, row) == parent
+
+
+def test_similar_names_resolved_by_branch(tree):
+    assert _parent_row(tree, 6) == 5
+    assert _parent_row(tree, 7) is None
+    assert tree.stats["ambiguous"] == 1
+
+
+def test_no_self_link(tree):
+    assert _parent_row(tree, 8) is None
+
+
+def test_depth_subtree_and_lineage(tree):
+    nodes, unresolved = tree.lineage(11)
+    assert [n["row"] for n in nodes] == [11, 2, 1, 0]
+    assert [n["depth"] for n in nodes] == [3, 2, 1, 0]
+    # أجداد الجذر غير المسجلين من سلسلة اسمه
+    assert unresolved == ["علي", "سالم"]
+    root = tree.person_of_row[0]
+    # 0 وذريته: 1، 2(=3)، 9، 10، 11
+    assert tree.subtree[root] == 6
+    assert tree.stats["cycles_broken"] == 0
+    assert tree.stats["family_name"] == "الاسطل"
+
+
+def test_branch_inherited_from_parent(tree):
+    node = tree.node(tree.person_of_row[10])
+    assert node["branch"] == "آل علي"
+    assert node["branch_inferred"]
+    assert not tree.node(tree.person_of_row[0])["branch_inferred"]
+    members = tree.members("آل علي")
+    # الجيل ثم الاسم: الجذران 0 و 4 أولاً
+    assert members["الاسم"].tolist()[:2] == [ROWS[0][0], ROWS[4][0]]
+    assert (np.diff(members["الجيل"].to_numpy()) >= 0).all()
+    assert len(members) == 7
+
+
+def test_children_of(tree):
+    rows = sorted(child["row"] for child in tree.children_of(0))
+    assert rows == [1, 9]
+
+
+def test_mutual_names_cycle_is_broken():
+    df = pd.DataFrame({NAME_COL: ["سالم ناصر سالم الأسطل", "ناصر سالم ناصر الأسطل"], ID_COL: ["1", "2"]})
+    tree = FamilyTree.from_frame(df)
+    assert tree.stats["cycles_broken"] == 1
+    assert (tree.depth >= 0).all()
+    assert tree.stats["roots"] == 1